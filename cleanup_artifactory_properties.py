@@ -1,5 +1,6 @@
+import argparse
 import logging
-import os
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import (
     Dict,
@@ -11,16 +12,52 @@ from rl_scan_artifactory import (
     MyArgs,
 )
 from rl_scan_artifactory.constants import (
-    ARTIFACTORY_KNOWN_PACKAGE_TYPES,
+    AQL_PAGE_SIZE,
+    PROP_NAME_SPECTRA_ASSURE_LEASE,
+    PROP_NAME_SPECTRA_ASSURE_NOSCAN,
+    PROP_SPECTRA_ASSURE_ALL,
     SPECTRA_ASSURE_PRE,
 )
 from rl_scan_artifactory.app_base_with_logging import AppBaseWithLogging
 from rl_scan_artifactory.artifactory_api import ArtifactoryApi
 from rl_scan_artifactory.artifactory_repo_info import ArtifactoryRepoInfo
-from rl_scan_artifactory.fileinfo import FileInfo
 
 logger = logging.getLogger("")
 
+"""
+Remove all RL.* (and the older Spectra.Assure.*) properties from the given repos.
+
+Per repo we list the top level folders and files once
+and delete all keys in one recursive request per top level item, with a pool of workers.
+With --dry-run we only count the items that have any of the properties.
+"""
+
+PROP_KEYS: List[str] = PROP_SPECTRA_ASSURE_ALL + [
+    PROP_NAME_SPECTRA_ASSURE_NOSCAN,
+]
+
+# also remove the properties of older versions: Spectra.Assure.*
+PROP_KEYS += ["Spectra.Assure." + key[len(f"{SPECTRA_ASSURE_PRE}.") :] for key in PROP_KEYS]
+
+# a lease left behind by a crashed --lease run; older versions had no leases
+PROP_KEYS.append(PROP_NAME_SPECTRA_ASSURE_LEASE)
+
+
+def add_extra_args(
+    parser: argparse.ArgumentParser,
+) -> None:
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only count the items with properties, delete nothing.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Parallel delete requests; default 8.",
+    )
+
 
 class ArtifactoryCleanup(
     AppBaseWithLogging,
@@ -59,80 +96,75 @@ class ArtifactoryCleanup(
 
         return repo
 
-    def extract_my_interesting_files(
-        self,
-        one_repo_list: Dict[str, Any],
-    ) -> List[Dict[str, Any]]:
-        my_interesting_files: List[Dict[str, Any]] = []
-        for item in one_repo_list.get("files", []):
-            if self.p_type != "generic":
-                # only ends with (if defined)
-                ew = ARTIFACTORY_KNOWN_PACKAGE_TYPES[self.p_type].get("endswith", "")
-                if len(ew) > 0:
-                    if not item.get("uri", "").endswith(ew):
-                        continue
-
-                # skip specific items not endswith (if defined)
-                not_ew = ARTIFACTORY_KNOWN_PACKAGE_TYPES[self.p_type].get("not_endswith", "")
-                if len(not_ew) > 0:
-                    if item.get("uri", "").endswith(not_ew):
-                        continue
-
-            logger.debug("append %s", item)
-            my_interesting_files.append(item)
-
-        return my_interesting_files
-
-    def _make_file_list_one_repo(
+    def _top_level_items(
         self,
         repo: ArtifactoryRepoInfo,
     ) -> List[Dict[str, Any]]:
-        if self.p_type not in ARTIFACTORY_KNOWN_PACKAGE_TYPES:
-            return []
-
         qp: Dict[str, Any] = {
-            "deep": 1,
+            "deep": 0,
             "mdTimestamps": 0,
-            "listFolders": 0,
+            "listFolders": 1,
         }
 
         one_repo_list = self.artifactory_api.list_repo_items(
             repo=repo,
             qp=qp,
         )
+        items: List[Dict[str, Any]] = one_repo_list.get("files", [])
+        return items
+
+    def _count_items_with_props(
+        self,
+        repo: ArtifactoryRepoInfo,
+    ) -> int | None:
+        criteria: Dict[str, Any] = {
+            "repo": self.artifactory_api.aql_repo_name(repo),
+            "type": "any",
+            "$or": [{f"@{key}": {"$match": "*"}} for key in PROP_KEYS],
+        }
+
+        items = self.artifactory_api.find_items_aql(
+            criteria=criteria,
+            include=["repo", "path", "name"],
+            page_size=AQL_PAGE_SIZE,
+        )
+        if items is None:
+            return None
+
+        return sum(1 for _ in items)
+
+    def _clear_props_one_item(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item: Dict[str, Any],
+    ) -> bool:
+        uri = item.get("uri", "")
+        ok = self.artifactory_api.del_props(
+            repo=repo,
+            item_uri=uri,
+            keys=PROP_KEYS,
+            recursive=bool(item.get("folder", False)),
+        )
+        if self.verbose:
+            print(f"# {repo.name}{uri}: {'ok' if ok else 'failed'}")
 
-        return self.extract_my_interesting_files(one_repo_list)
+        return ok
 
     def clear_all_spectra_assure_props(
         self,
-        file: FileInfo,
+        repo: ArtifactoryRepoInfo,
     ) -> None:
-        to_del: List[str] = []
-        for key, val in file.properties.items():
-            if key.startswith(f"{SPECTRA_ASSURE_PRE}."):
-                logger.debug(key)
-                self.artifactory_api.del_one_prop(
-                    repo=file.repo,
-                    item_uri=file.uri,
-                    key=key,
-                    recursive=False,
-                )
-                to_del.append(key)
-
-            if key.startswith("Spectra.Assure."):
-                logger.debug(key)
-                self.artifactory_api.del_one_prop(
-                    repo=file.repo,
-                    item_uri=file.uri,
-                    key=key,
-                    recursive=False,
-                )
-                to_del.append(key)
-
-        if len(to_del) > 0:
-            logger.debug(to_del)
-            for k in to_del:
-                del file.properties[k]
+        items = self._top_level_items(repo)
+        workers = max(1, int(self.cli_args.get("workers") or 1))
+
+        def clear_one(item: Dict[str, Any]) -> bool:
+            return self._clear_props_one_item(repo, item)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(clear_one, items))
+
+        failed = len([r for r in results if r is False])
+        print(f"# REPO: {repo.name}; top level items: {len(items)}, failed: {failed}")
 
     def run(
         self,
@@ -140,28 +172,13 @@ class ArtifactoryCleanup(
         repo_names = self.cli_args.get("repo", [])
         for repo_name in sorted(repo_names):
             repo = self._make_repo_info(repo_name=repo_name)
-            self.p_type = repo.package_type.lower()
-            item_list = self._make_file_list_one_repo(
-                repo=repo,
-            )
-            for item in item_list:
-                uri = item.get("uri", "")
-                file = FileInfo(
-                    repo=repo,
-                    uri=uri,
-                    sha1=str(item.get("sha1")),
-                    sha2=str(item.get("sha2")),
-                    last_modified=item.get("lastModified", ""),
-                    file_name=os.path.basename(uri),
-                )
-                file.properties = self.artifactory_api.get_item_properties(file=file)
-                print("# FILE: ", file)
-                print("# PRE: ", file.properties)
-
-                self.clear_all_spectra_assure_props(file=file)
-
-                props = self.artifactory_api.get_item_properties(file=file)
-                print("# POST: ", props)
+
+            if self.cli_args.get("dry_run"):
+                n = self._count_items_with_props(repo)
+                print(f"# REPO: {repo.name}; items with properties: {'unknown (no aql)' if n is None else n}")
+                continue
+
+            self.clear_all_spectra_assure_props(repo=repo)
 
 
 def main() -> None:
@@ -170,7 +187,9 @@ def main() -> None:
         logging.getLogger(name).setLevel(logging.CRITICAL)
         logging.getLogger(name).propagate = False
 
-    args = MyArgs()
+    args = MyArgs(
+        add_extra_args=add_extra_args,
+    )
 
     ac = ArtifactoryCleanup(args=args)
     ac.run()
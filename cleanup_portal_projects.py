@@ -1,33 +1,83 @@
 # python3 ts=4space
 
 # DANGER THIS WILL DELETE ALL YOUR PROJECTS IN YOUR GROUP
+import argparse
 import logging
+import os
+
+from typing import (
+    List,
+)
 
 from rl_scan_artifactory import (
     MyArgs,
 )
-from rl_scan_artifactory.with_cleanup_porta import WithCleanupPortal
+from rl_scan_artifactory.portal_cleanup import PortalCleanup
 from rl_scan_artifactory.spectra_assure_api import SpectraAssureApi
 
-
 logger = logging.getLogger(__name__)
 
 
+def add_extra_args(
+    parser: argparse.ArgumentParser,
+) -> None:
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Parallel delete requests; default 4.",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help="Record every finished delete in this file and skip them when started again.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only show what would be deleted.",
+    )
+
+
+def select_projects(
+    projects: List[str],
+    repo_list: List[str],
+) -> List[str]:
+    if bool(int(os.getenv("WITH_TEST_CLEANUP_ALL_PROJECTS", 0))):
+        return projects
+
+    if bool(int(os.getenv("WITH_TEST_CLEANUP_MY_PROJECTS", 0))):
+        # as many package_types modify the project name we will not delete all items anyway
+        return [p for p in projects if p in repo_list]
+
+    return []
+
+
 def main() -> None:
     for name in ["requests", "urllib3"]:
         # https://stackoverflow.com/questions/11029717/how-do-i-disable-log-messages-from-the-requests-library
         logging.getLogger(name).setLevel(logging.CRITICAL)
         logging.getLogger(name).propagate = False
 
-    args = MyArgs()
+    args = MyArgs(
+        add_extra_args=add_extra_args,
+    )
     print(args.cli_args["repo"])
 
     spectra_assure_api = SpectraAssureApi(args=args)
-    wcp = WithCleanupPortal()
-    wcp.cleanup_test_portal(
+    pc = PortalCleanup(
         spectra_assure_api=spectra_assure_api,
-        repo_list=args.cli_args["repo"],
+        workers=args.cli_args["workers"],
+        state_file=args.cli_args["state_file"],
+        dry_run=args.cli_args["dry_run"],
     )
 
+    projects = select_projects(pc.list_projects(), args.cli_args["repo"])
+    if len(projects) == 0:
+        print("nothing to delete: set WITH_TEST_CLEANUP_MY_PROJECTS=1 or WITH_TEST_CLEANUP_ALL_PROJECTS=1")
+        return
+
+    pc.cleanup(projects)
+
 
 main()
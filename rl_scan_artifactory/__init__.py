@@ -1,7 +1,21 @@
-from .my_app import MyApp as MyApp
-from .my_args import MyArgs as MyArgs
+from typing import TYPE_CHECKING
+
+from .helpers import lazy_module_getattr
+
+if TYPE_CHECKING:
+    from .my_app import MyApp as MyApp
+    from .my_args import MyArgs as MyArgs
 
 __all__ = [
     "MyArgs",
     "MyApp",
 ]
+
+# MyApp pulls in the scanner backends, load it only when it is really used
+__getattr__ = lazy_module_getattr(
+    __name__,
+    {
+        "MyArgs": ".my_args",
+        "MyApp": ".my_app",
+    },
+)
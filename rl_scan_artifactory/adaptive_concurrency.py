@@ -0,0 +1,226 @@
+# python3 ts=4space
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import (
+    Deque,
+    Dict,
+    Iterator,
+    List,
+)
+
+from .constants import (
+    ADAPTIVE_DECREASE_COOLDOWN,
+    ADAPTIVE_LATENCY_TOLERANCE,
+    ADAPTIVE_LATENCY_WINDOW,
+    ADAPTIVE_MAX_IN_FLIGHT,
+    ADAPTIVE_START_IN_FLIGHT,
+    THROTTLE_STATUS_CODES,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+With --adaptive-concurrency the number of requests in flight to a backend is limited per operation class
+(download, upload, property) and the limit is adapted with AIMD (additive increase, multiplicative decrease):
+
+ - a 429 or 503 response, or a request that fails without a response, halves the limit,
+ - after each round (as many completed requests as the current limit) the limit grows by 1,
+ - for property calls only: at the end of a round the p95 latency of the recent requests is compared
+   to the best p95 seen so far, more then ADAPTIVE_LATENCY_TOLERANCE times slower multiplies the limit by 0.8.
+
+The time of a upload or download grows with its size, not only with the load of the server,
+so for those only the throttling responses count.
+The best p95 slowly ages, so a quiet start does not pin the limit down forever.
+Decreases are at most once per ADAPTIVE_DECREASE_COOLDOWN seconds,
+as the requests already in flight report the same congestion.
+The portal sdk would retry a 429 itself and hide it, so with a limit the portal calls retry in
+SpectraAssureApi.call(), each attempt in its own slot.
+"""
+
+
+OPERATION_DOWNLOAD = "download"
+OPERATION_UPLOAD = "upload"
+OPERATION_PROPERTY = "property"
+
+OPERATIONS = [
+    OPERATION_DOWNLOAD,
+    OPERATION_UPLOAD,
+    OPERATION_PROPERTY,
+]
+
+# the latency of these does not depend on the size of a artifact
+LATENCY_SIGNAL_OPERATIONS = [
+    OPERATION_PROPERTY,
+]
+
+
+def _p95(
+    values: List[float],
+) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class AimdLimit:
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        min_in_flight: int = 1,
+        start: int = ADAPTIVE_START_IN_FLIGHT,
+        latency_signal: bool = True,  # False: react to throttling only
+    ) -> None:
+        self.name = name
+        self.latency_signal = latency_signal
+        self.min_in_flight = max(1, min_in_flight)
+        self.max_in_flight = max(self.min_in_flight, max_in_flight)
+        self.limit = float(min(self.max_in_flight, max(self.min_in_flight, start)))
+
+        self.in_flight = 0
+        self.completed = 0
+        self.throttled = 0
+        self.latencies: Deque[float] = deque(maxlen=ADAPTIVE_LATENCY_WINDOW)
+        self.best_p95: float | None = None
+        self._round = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(
+        self,
+    ) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def _decrease(
+        self,
+        factor: float,
+        reason: str,
+    ) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < ADAPTIVE_DECREASE_COOLDOWN:
+            return
+
+        self._last_decrease = now
+        self.limit = max(float(self.min_in_flight), self.limit * factor)
+        self._round = 0
+        self.latencies.clear()
+        logger.info("adaptive %s: %s, limit -> %d", self.name, reason, int(self.limit))
+
+    def _end_of_round(
+        self,
+    ) -> None:
+        if self.latency_signal:
+            p95 = _p95(list(self.latencies))
+            if self.best_p95 is None:
+                self.best_p95 = p95
+            self.best_p95 = min(p95, self.best_p95 * 1.01)
+
+            if p95 > self.best_p95 * ADAPTIVE_LATENCY_TOLERANCE:
+                self._decrease(0.8, f"p95 {p95:.3f}s > {ADAPTIVE_LATENCY_TOLERANCE} * {self.best_p95:.3f}s")
+                return
+
+        if self.limit < self.max_in_flight:
+            self.limit = min(float(self.max_in_flight), self.limit + 1)
+            logger.debug("adaptive %s: limit -> %d", self.name, int(self.limit))
+
+    def release(
+        self,
+        latency: float,
+        status_code: int | None,  # None: the request failed without a response
+    ) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self.completed += 1
+
+            if status_code is None or status_code in THROTTLE_STATUS_CODES:
+                self.throttled += 1
+                self._decrease(0.5, f"throttled: {status_code}")
+            else:
+                if self.latency_signal:
+                    self.latencies.append(latency)
+                self._round += 1
+                if self._round >= int(self.limit):
+                    self._round = 0
+                    self._end_of_round()
+
+            self._cond.notify_all()
+
+    def snapshot(
+        self,
+    ) -> Dict[str, float | int | None]:
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "throttled": self.throttled,
+                "best_p95": None if self.best_p95 is None else round(self.best_p95, 3),
+            }
+
+
+class Slot:
+    """one request in flight; report the response with done(), without it the request counts as failed"""
+
+    def __init__(
+        self,
+    ) -> None:
+        self.start = time.monotonic()
+        self.latency: float | None = None
+        self.status_code: int | None = None
+
+    def done(
+        self,
+        response: object,  # a requests.Response or anything with a status_code
+    ) -> None:
+        self.status_code = int(getattr(response, "status_code", 0))
+        elapsed = getattr(response, "elapsed", None)  # requests: until the headers arrived
+        if elapsed is not None:
+            self.latency = elapsed.total_seconds()
+        else:
+            self.latency = time.monotonic() - self.start
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        operations: List[str],
+        enabled: bool = False,
+        max_in_flight: int = ADAPTIVE_MAX_IN_FLIGHT,
+    ) -> None:
+        self.limits: Dict[str, AimdLimit] = {}
+        if enabled:
+            self.limits = {
+                name: AimdLimit(
+                    name=name,
+                    max_in_flight=max_in_flight,
+                    latency_signal=name in LATENCY_SIGNAL_OPERATIONS,
+                )
+                for name in operations
+            }
+
+    @contextmanager
+    def slot(
+        self,
+        name: str,
+    ) -> Iterator[Slot]:
+        limit = self.limits.get(name)
+        if limit is not None:
+            limit.acquire()
+
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            if limit is not None:
+                latency = slot.latency if slot.latency is not None else time.monotonic() - slot.start
+                limit.release(latency, slot.status_code)
+
+    def snapshot(
+        self,
+    ) -> Dict[str, Dict[str, float | int | None]]:
+        return {name: limit.snapshot() for name, limit in self.limits.items()}
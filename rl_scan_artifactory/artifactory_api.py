@@ -1,11 +1,13 @@
 # python3 ts=4space
 import hashlib
+import json
 import logging
 import os
 import time
 from typing import (
     Dict,
     Any,
+    Iterator,
     Tuple,
     List,
 )
@@ -15,11 +17,31 @@ import urllib3
 
 from .app_base_with_logging import AppBaseWithLogging
 from .artifactory_repo_info import ArtifactoryRepoInfo
+from .exceptions import SpectraAssureInvalidAction
 from .fileinfo import FileInfo
 from .helpers import set_proxy
+from .json_stream import iter_json_array
 from .my_args import MyArgs
+from .adaptive_concurrency import (
+    AdaptiveConcurrency,
+    OPERATION_DOWNLOAD,
+    OPERATION_PROPERTY,
+    OPERATION_UPLOAD,
+    OPERATIONS,
+)
+from .rate_limiter import (
+    RateLimiter,
+    REQUEST_CLASS_DOWNLOAD,
+    REQUEST_CLASS_READ,
+    REQUEST_CLASS_SEARCH,
+    REQUEST_CLASS_WRITE,
+)
 from .constants import (
+    ADAPTIVE_MAX_IN_FLIGHT,
+    AQL_PAGE_SIZE,
     ARTIFACTORY_DOWNLOAD_TIMEOUT,
+    LISTING_STREAM_CHUNK_SIZE,
+    SMALL_OBJECT_MAX_SIZE,
     VERIFY_BUF_SIZE,
     DEFAULT_DIGEST_TYPE,
 )
@@ -38,6 +60,15 @@ class ArtifactoryApiBase(
         self.session = requests.Session()
         self._validate_my_params()
         self.timeout = ARTIFACTORY_DOWNLOAD_TIMEOUT  # 2 hours for large downloads
+        self.rate_limiter = RateLimiter.from_args(
+            request_rates=self.cli_args.get("artifactory_rate"),
+            download_bandwidth=self.cli_args.get("artifactory_bandwidth"),
+        )
+        self.concurrency = AdaptiveConcurrency(
+            operations=OPERATIONS,
+            enabled=self.cli_args.get("adaptive_concurrency") is True,
+            max_in_flight=int(self.cli_args.get("adaptive_max_in_flight") or ADAPTIVE_MAX_IN_FLIGHT),
+        )
 
         proxy_server = self.cli_args.get("proxy_server")
         proxy_port = self.cli_args.get("proxy_port")
@@ -82,26 +113,28 @@ class ArtifactoryApiBase(
             params = {}
 
         logger.debug("url: %s", url)
-
-        if self.api_key:
-            headers = {"X-JFrog-Art-Api": self.api_key}
-            r = self.session.get(
-                url,
-                headers=headers,
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-            )
-        else:
-            assert self.token is not None
-            assert self.user is not None
-            r = self.session.get(
-                url,
-                auth=(self.user, self.token),
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-            )
+        self.rate_limiter.request(REQUEST_CLASS_READ)
+        with self.concurrency.slot(OPERATION_PROPERTY) as slot:
+            if self.api_key:
+                headers = {"X-JFrog-Art-Api": self.api_key}
+                r = self.session.get(
+                    url,
+                    headers=headers,
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            else:
+                assert self.token is not None
+                assert self.user is not None
+                r = self.session.get(
+                    url,
+                    auth=(self.user, self.token),
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            slot.done(r)
 
         logger.debug("status: %d, %s", r.status_code, r.text)
         return r
@@ -115,27 +148,29 @@ class ArtifactoryApiBase(
             params = {}
 
         logger.debug("url: %s:: %s", url, params)
+        self.rate_limiter.request(REQUEST_CLASS_WRITE)
         # Supported by local and local-cached repositories.
-
-        if self.api_key:
-            headers = {"X-JFrog-Art-Api": self.api_key}
-            r = self.session.put(
-                url,
-                headers=headers,
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-            )
-        else:
-            assert self.token is not None
-            assert self.user is not None
-            r = self.session.put(
-                url,
-                auth=(self.user, self.token),
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-            )
+        with self.concurrency.slot(OPERATION_PROPERTY) as slot:
+            if self.api_key:
+                headers = {"X-JFrog-Art-Api": self.api_key}
+                r = self.session.put(
+                    url,
+                    headers=headers,
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            else:
+                assert self.token is not None
+                assert self.user is not None
+                r = self.session.put(
+                    url,
+                    auth=(self.user, self.token),
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            slot.done(r)
 
         logger.debug("status: %d, %s", r.status_code, r.text)
         return r
@@ -143,26 +178,53 @@ class ArtifactoryApiBase(
     def _request_put_upload_file(
         self,
         url: str,
-        file_path: str,
+        file_path: str | None,
         params: Dict[str, Any] | None = None,
+        headers: Dict[str, Any] | None = None,
     ) -> Any:
+        """
+        PUT the file at file_path,
+        the open file is passed as body so requests streams it and never holds the whole file in memory.
+        with file_path None we send no body at all (checksum deploy).
+        """
         if params is None:
             params = {}
+        if headers is None:
+            headers = {}
 
-        logger.debug("url: %s:: %s", url, params)
-
-        assert self.token is not None
-        assert self.user is not None
+        logger.debug("url: %s:: %s %s", url, params, headers)
+        self.rate_limiter.request(REQUEST_CLASS_WRITE)
 
-        with open(file_path, "rb") as upload_data:
-            r = self.session.put(
-                url,
-                auth=(self.user, self.token),
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-                data=upload_data,
-            )
+        auth: Tuple[str, str] | None = None
+        if self.api_key:
+            headers["X-JFrog-Art-Api"] = self.api_key
+        else:
+            assert self.token is not None
+            assert self.user is not None
+            auth = (self.user, self.token)
+
+        with self.concurrency.slot(OPERATION_UPLOAD) as slot:
+            if file_path is None:
+                r = self.session.put(
+                    url,
+                    auth=auth,
+                    headers=headers,
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            else:
+                with open(file_path, "rb") as upload_data:
+                    r = self.session.put(
+                        url,
+                        auth=auth,
+                        headers=headers,
+                        timeout=self.timeout,
+                        params=params,
+                        proxies=self.proxies,
+                        data=upload_data,
+                    )
+            slot.done(r)
 
         logger.debug("status: %d, %s", r.status_code, r.text)
         return r
@@ -176,27 +238,29 @@ class ArtifactoryApiBase(
             params = {}
 
         logger.debug("url: %s, %s", url, params)
+        self.rate_limiter.request(REQUEST_CLASS_WRITE)
         # Supported by local and local-cached repositories.
-
-        if self.api_key:
-            headers = {"X-JFrog-Art-Api": self.api_key}
-            r = self.session.delete(
-                url,
-                headers=headers,
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-            )
-        else:
-            assert self.token is not None
-            assert self.user is not None
-            r = self.session.delete(
-                url,
-                auth=(self.user, self.token),
-                timeout=self.timeout,
-                params=params,
-                proxies=self.proxies,
-            )
+        with self.concurrency.slot(OPERATION_PROPERTY) as slot:
+            if self.api_key:
+                headers = {"X-JFrog-Art-Api": self.api_key}
+                r = self.session.delete(
+                    url,
+                    headers=headers,
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            else:
+                assert self.token is not None
+                assert self.user is not None
+                r = self.session.delete(
+                    url,
+                    auth=(self.user, self.token),
+                    timeout=self.timeout,
+                    params=params,
+                    proxies=self.proxies,
+                )
+            slot.done(r)
 
         logger.debug("status: %d, %s", r.status_code, r.text)
         return r
@@ -211,6 +275,7 @@ class ArtifactoryApiBase(
             headers = {}
 
         logger.debug("url: %s:: %s", url, data)
+        self.rate_limiter.request(REQUEST_CLASS_SEARCH)
 
         if self.api_key:
             headers["X-JFrog-Art-Api"] = self.api_key
@@ -237,36 +302,76 @@ class ArtifactoryApiBase(
         logger.debug("status: %d, %s", r.status_code, r.text)
         return r
 
-    def _request_patch(
+    def _request_post_text(
         self,
         url: str,
-        data: Dict[str, Any],
-        headers: Dict[str, Any],
+        data: str,
+        headers: Dict[str, Any] | None = None,
     ) -> Any:
-        logger.debug("url: %s::%s", url, data)
-        # Supported by local and local-cached repositories.
+        if headers is None:
+            headers = {}
+
+        logger.debug("url: %s:: %s", url, data)
+        self.rate_limiter.request(REQUEST_CLASS_SEARCH)
+        headers["Content-Type"] = "text/plain"
 
         if self.api_key:
             headers["X-JFrog-Art-Api"] = self.api_key
 
-            r = self.session.patch(
+            r = self.session.post(
                 url,
+                timeout=self.timeout,
                 headers=headers,
-                timeout=300,
+                data=data,
                 proxies=self.proxies,
             )
         else:
             assert self.token is not None
             assert self.user is not None
-            r = self.session.patch(
+            r = self.session.post(
                 url,
-                data={"props": data},
                 auth=(self.user, self.token),
+                timeout=self.timeout,
                 headers=headers,
-                timeout=300,
+                data=data,
                 proxies=self.proxies,
             )
 
+        logger.debug("status: %d", r.status_code)
+        return r
+
+    def _request_patch(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        headers: Dict[str, Any],
+    ) -> Any:
+        logger.debug("url: %s::%s", url, data)
+        self.rate_limiter.request(REQUEST_CLASS_WRITE)
+        # Supported by local and local-cached repositories.
+        with self.concurrency.slot(OPERATION_PROPERTY) as slot:
+            if self.api_key:
+                headers["X-JFrog-Art-Api"] = self.api_key
+
+                r = self.session.patch(
+                    url,
+                    headers=headers,
+                    timeout=300,
+                    proxies=self.proxies,
+                )
+            else:
+                assert self.token is not None
+                assert self.user is not None
+                r = self.session.patch(
+                    url,
+                    data={"props": data},
+                    auth=(self.user, self.token),
+                    headers=headers,
+                    timeout=300,
+                    proxies=self.proxies,
+                )
+            slot.done(r)
+
         logger.debug("status: %d, %s", r.status_code, r.text)
         return r
 
@@ -331,32 +436,36 @@ class ArtifactoryApi(ArtifactoryApiBase):
                 if attempt > 1:
                     time.sleep(10)  # 10 seconds wait time between downloads
 
-                if self.api_key:
-                    headers = {"X-JFrog-Art-Api": self.api_key}
-                    r = self.session.get(
-                        url,
-                        headers=headers,
-                        timeout=self.timeout,
-                        stream=True,
-                        proxies=self.proxies,
-                    )
-                else:
-                    assert self.token is not None
-                    assert self.user is not None
-                    r = self.session.get(
-                        url,
-                        auth=(self.user, self.token),
-                        timeout=self.timeout,
-                        stream=True,
-                        proxies=self.proxies,
-                    )
-
-                r.raise_for_status()
-                with open(file_path, "wb") as out_file:
-                    for chunk in r.iter_content(
-                        chunk_size=chunk_size,
-                    ):
-                        out_file.write(chunk)
+                self.rate_limiter.request(REQUEST_CLASS_DOWNLOAD)
+
+                with self.concurrency.slot(OPERATION_DOWNLOAD) as slot:
+                    if self.api_key:
+                        headers = {"X-JFrog-Art-Api": self.api_key}
+                        r = self.session.get(
+                            url,
+                            headers=headers,
+                            timeout=self.timeout,
+                            stream=True,
+                            proxies=self.proxies,
+                        )
+                    else:
+                        assert self.token is not None
+                        assert self.user is not None
+                        r = self.session.get(
+                            url,
+                            auth=(self.user, self.token),
+                            timeout=self.timeout,
+                            stream=True,
+                            proxies=self.proxies,
+                        )
+                    slot.done(r)
+                    r.raise_for_status()
+                    with open(file_path, "wb") as out_file:
+                        for chunk in r.iter_content(
+                            chunk_size=chunk_size,
+                        ):
+                            out_file.write(chunk)
+                            self.rate_limiter.downloaded(len(chunk))
 
                 logger.info("Download finished successfully: %s", file_path)
                 return file_path
@@ -407,6 +516,98 @@ class ArtifactoryApi(ArtifactoryApiBase):
     ) -> str:
         return self.base_url
 
+    def get_file_url(
+        self,
+        file: FileInfo,
+    ) -> str:
+        return f"{self.base_url}/{file.repo.name}{file.uri}"
+
+    def fetch_small_object(
+        self,
+        url: str,
+        sha256: str | None = None,
+        max_size: int = SMALL_OBJECT_MAX_SIZE,
+    ) -> Tuple[bytes | None, bool]:
+        """
+        Fetch a small object (manifest, docker config, meta file) into memory, no temp file.
+        Returns (None, False) if the download fails or the object is larger then max_size:
+        the caller then falls back to the download to file.
+        verify_ok is only True if the sha256 is given and matches.
+        """
+        logger.debug("fetch %s, %s", url, sha256)
+
+        try:
+            self.rate_limiter.request(REQUEST_CLASS_DOWNLOAD)
+            with self.concurrency.slot(OPERATION_DOWNLOAD) as slot:
+                if self.api_key:
+                    r = self.session.get(
+                        url,
+                        headers={"X-JFrog-Art-Api": self.api_key},
+                        timeout=self.timeout,
+                        stream=True,
+                        proxies=self.proxies,
+                    )
+                else:
+                    assert self.token is not None
+                    assert self.user is not None
+                    r = self.session.get(
+                        url,
+                        auth=(self.user, self.token),
+                        timeout=self.timeout,
+                        stream=True,
+                        proxies=self.proxies,
+                    )
+                slot.done(r)
+                with r:
+                    r.raise_for_status()
+                    if int(r.headers.get("Content-Length") or 0) > max_size:
+                        logger.debug("too large for memory: %s", url)
+                        return None, False
+
+                    buf = bytearray()
+                    for chunk in r.iter_content(chunk_size=VERIFY_BUF_SIZE):
+                        buf += chunk
+                        self.rate_limiter.downloaded(len(chunk))
+                        if len(buf) > max_size:
+                            logger.debug("too large for memory: %s", url)
+                            return None, False
+                    data = bytes(buf)
+
+        except Exception as e:
+            logger.error("fetch failed: %s; %s", url, e)
+            return None, False
+
+        if sha256 is None:
+            return data, False
+
+        digest = hashlib.new(DEFAULT_DIGEST_TYPE, data).hexdigest()
+        verify_ok = digest.lower() == sha256.lower()
+        if verify_ok is False:
+            logger.warning("url: %s with digest: %s is not identical to sha2: %s", url, digest, sha256)
+
+        return data, verify_ok
+
+    def fetch_small_json(
+        self,
+        url: str,
+        sha256: str | None = None,
+        max_size: int = SMALL_OBJECT_MAX_SIZE,
+    ) -> Tuple[Any, bool]:
+        """as fetch_small_object() but parse the json; (None, False) if it is not json"""
+        data, verify_ok = self.fetch_small_object(
+            url=url,
+            sha256=sha256,
+            max_size=max_size,
+        )
+        if data is None:
+            return None, False
+
+        try:
+            return json.loads(data), verify_ok
+        except Exception as e:
+            logger.error("not json: %s; %s", url, e)
+            return None, False
+
     def download_one_file_with_verify(
         self,
         *,
@@ -423,7 +624,7 @@ class ArtifactoryApi(ArtifactoryApiBase):
         )
 
         download_path, verify_ok = self.download_url_to_target_with_verify(
-            url=f"{self.base_url}/{file.repo.name}{file.uri}",
+            url=self.get_file_url(file),
             target_path=target_path,
             sha256=file.sha2,
         )
@@ -490,11 +691,186 @@ class ArtifactoryApi(ArtifactoryApiBase):
 
         return r.json()
 
-    def list_repo_items(
+    @staticmethod
+    def aql_repo_name(
+        repo: ArtifactoryRepoInfo,
+    ) -> str:
+        # aql only knows the cache of a remote repository
+        if repo.repo_type.lower() == "remote":
+            return repo.name + "-cache"
+        return repo.name
+
+    @staticmethod
+    def aql_item_to_list_item(
+        item: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """convert a aql result item to the format of a storage list 'files' item"""
+        path = item.get("path", "")
+        name = item.get("name", "")
+        uri = f"/{name}" if path in ["", "."] else f"/{path}/{name}"
+
+        return {
+            "uri": uri,
+            "size": item.get("size", 0),
+            "lastModified": item.get("modified", ""),
+            "folder": False,
+            "sha1": item.get("actual_sha1", ""),
+            "sha2": item.get("sha256", ""),
+        }
+
+    def search_aql(
+        self,
+        query: str,
+    ) -> Dict[str, Any] | None:
+        # POST /api/search/aql
+        # returns None if the query fails (e.g. aql is not permitted for this user)
+        url = f"{self.base_url}/api/search/aql"
+
+        r = self._request_post_text(
+            url=url,
+            data=query,
+        )
+        if r.status_code < 200 or r.status_code >= 300:
+            logger.warning("aql query failed: %d, %s", r.status_code, r.text)
+            return None
+
+        result: Dict[str, Any] = r.json()
+        return result
+
+    def find_items_aql(
+        self,
+        criteria: Dict[str, Any],
+        include: List[str],
+        page_size: int = 0,
+    ) -> Iterator[Dict[str, Any]] | None:
+        """
+        items.find(criteria).include(include), optionally paged by page_size items per request.
+
+        returns None if the first query fails so the caller can fall back to a other api,
+        a failing later page ends the iteration.
+        aql ignores sort, offset and limit if the include has properties (@<key>), so paging needs item fields only.
+        """
+        if page_size > 0 and any(k.startswith("@") for k in include):
+            msg = f"aql paging is not possible with properties in the include: {include}"
+            raise SpectraAssureInvalidAction(message=msg)
+
+        query = "items.find(" + json.dumps(criteria) + ")"
+        query += ".include(" + ",".join(json.dumps(k) for k in include) + ")"
+
+        if page_size <= 0:
+            data = self.search_aql(query)
+            if data is None:
+                return None
+            results: List[Dict[str, Any]] = data.get("results", [])
+            return iter(results)
+
+        # paging needs a stable order
+        query += '.sort({"$asc": ["repo", "path", "name"]})'
+
+        first = self.search_aql(query + f".offset(0).limit({page_size})")
+        if first is None:
+            return None
+
+        def pages(data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+            offset = 0
+            while True:
+                results = data.get("results", [])
+                yield from results
+                if len(results) < page_size:
+                    return
+
+                offset += page_size
+                next_data = self.search_aql(query + f".offset({offset}).limit({page_size})")
+                if next_data is None:
+                    logger.error("aql paging stopped at offset: %d", offset)
+                    return
+                data = next_data
+
+        return pages(first)
+
+    @staticmethod
+    def aql_item_properties(
+        item: Dict[str, Any],
+    ) -> Dict[str, str]:
+        """the 'properties' list of a aql result item as a dict, first value wins"""
+        props: Dict[str, str] = {}
+        for prop in item.get("properties", []):
+            key = prop.get("key")
+            if key is not None and key not in props:
+                props[key] = str(prop.get("value", ""))
+        return props
+
+    def find_items_with_property_aql(
+        self,
+        key: str,
+        value: str,
+        repo_name: str | None = None,
+        props: List[str] | None = None,
+        page_size: int = AQL_PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]] | None:
+        """
+        all files with property key=value, in one repo (and its remote cache) or in all repos.
+        the files are paged with item fields only,
+        the properties in props are fetched per page and added to the result items.
+        """
+        criteria: Dict[str, Any] = {
+            "type": "file",
+            f"@{key}": value,
+        }
+        if repo_name is not None:
+            criteria["$or"] = [
+                {"repo": repo_name},
+                {"repo": f"{repo_name}-cache"},
+            ]
+
+        items = self.find_items_aql(
+            criteria=criteria,
+            include=["repo", "path", "name", "modified"],
+            page_size=page_size,
+        )
+        if items is None or not props:
+            return items
+
+        def with_props(items: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            page: List[Dict[str, Any]] = []
+            for item in items:
+                page.append(item)
+                if len(page) >= max(1, page_size):
+                    yield from self._add_properties_aql(page, props)
+                    page = []
+            if page:
+                yield from self._add_properties_aql(page, props)
+
+        return with_props(items)
+
+    def _add_properties_aql(
+        self,
+        page: List[Dict[str, Any]],
+        props: List[str],
+    ) -> List[Dict[str, Any]]:
+        """add the 'properties' in props to the aql result items of one page, with one non paged query"""
+        criteria: Dict[str, Any] = {
+            "type": "file",
+            "$or": [{"repo": item.get("repo"), "path": item.get("path"), "name": item.get("name")} for item in page],
+        }
+        results = self.find_items_aql(
+            criteria=criteria,
+            include=["repo", "path", "name"] + [f"@{p}" for p in props],
+        )
+        if results is None:
+            logger.error("aql query for the properties failed, %d items without properties", len(page))
+            return page
+
+        found = {(r.get("repo"), r.get("path"), r.get("name")): r.get("properties", []) for r in results}
+        for item in page:
+            item["properties"] = found.get((item.get("repo"), item.get("path"), item.get("name")), [])
+        return page
+
+    def _list_repo_items_url(
         self,
         repo: ArtifactoryRepoInfo,
         qp: Dict[str, Any] | None = None,
-    ) -> Any:
+    ) -> str:
         # GET /api/storage/{repoKey}/{folder-path}
         #   ?list[&deep=0/1][&depth=n][&listFolders=0/1][&mdTimestamps=0/1][&includeRootPath=0/1]
         if qp is None:
@@ -508,15 +884,69 @@ class ArtifactoryApi(ArtifactoryApiBase):
         if len(z):
             z_s = "&" + z_s
 
-        url = f"{self.base_url}/api/storage/{repo.name}?list{z_s}"
+        return f"{self.base_url}/api/storage/{repo.name}?list{z_s}"
+
+    def list_repo_items(
+        self,
+        repo: ArtifactoryRepoInfo,
+        qp: Dict[str, Any] | None = None,
+    ) -> Any:
+        url = self._list_repo_items_url(repo=repo, qp=qp)
         r = self._request_get(url)
 
         if r.status_code < 200 or r.status_code >= 300:
             return {}
 
-        logger.debug("result: %s", r.json())
+        data = r.json()
+        logger.debug("listed %s: %d items", repo.name, len(data.get("files", [])))
+        return data
 
-        return r.json()
+    def iter_repo_items(
+        self,
+        repo: ArtifactoryRepoInfo,
+        qp: Dict[str, Any] | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the 'files' of a storage listing while the response arrives.
+        A deep listing of a large repo can be hundreds of MB,
+        it is never held in memory as a whole and never logged.
+        """
+        url = self._list_repo_items_url(repo=repo, qp=qp)
+        logger.debug("url: %s", url)
+
+        self.rate_limiter.request(REQUEST_CLASS_READ)
+        with self.concurrency.slot(OPERATION_PROPERTY) as slot:
+            if self.api_key:
+                r = self.session.get(
+                    url,
+                    headers={"X-JFrog-Art-Api": self.api_key},
+                    timeout=self.timeout,
+                    stream=True,
+                    proxies=self.proxies,
+                )
+            else:
+                assert self.token is not None
+                assert self.user is not None
+                r = self.session.get(
+                    url,
+                    auth=(self.user, self.token),
+                    timeout=self.timeout,
+                    stream=True,
+                    proxies=self.proxies,
+                )
+            slot.done(r)
+
+            with r:
+                if r.status_code < 200 or r.status_code >= 300:
+                    logger.error("list %s: %d, %s", repo.name, r.status_code, r.reason)
+                    return
+
+                n = 0
+                for item in iter_json_array(r.iter_content(chunk_size=LISTING_STREAM_CHUNK_SIZE), "files"):
+                    n += 1
+                    yield item
+
+        logger.debug("listed %s: %d items", repo.name, n)
 
     def list_file_info(
         self,
@@ -634,16 +1064,30 @@ class ArtifactoryApi(ArtifactoryApiBase):
         item_uri: str,
         key: str,
         recursive: bool = False,
+    ) -> bool:
+        return self.del_props(
+            repo=repo,
+            item_uri=item_uri,
+            keys=[key],
+            recursive=recursive,
+        )
+
+    def del_props(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item_uri: str,
+        keys: List[str],
+        recursive: bool = False,
     ) -> bool:
         # DELETE /api/storage/libs-release-local/ch/qos/logback/logback-classic/0.9.9?properties=os,qa&recursive=0
-        logger.debug("del prop %s:%s %s %s", repo.name, item_uri, key, recursive)
+        logger.debug("del props %s:%s %s %s", repo.name, item_uri, keys, recursive)
 
         repo_name = repo.name
         if repo.repo_type.lower() == "remote":
             repo_name = repo.name + "-cache"
 
         params = {
-            "properties": key,
+            "properties": ",".join(keys),
             "recursive": int(recursive),
         }
 
@@ -729,17 +1173,61 @@ class ArtifactoryApi(ArtifactoryApiBase):
 
         return r.json()
 
+    @staticmethod
+    def _file_checksums(
+        file_path: str,
+    ) -> Tuple[str, str]:
+        """sha1 and sha256 of a file in one pass"""
+        h1 = hashlib.sha1()
+        h2 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            while True:
+                data = f.read(VERIFY_BUF_SIZE)
+                if not data:
+                    break
+                h1.update(data)
+                h2.update(data)
+
+        return h1.hexdigest(), h2.hexdigest()
+
     def upload_file_to_artifactory(
         self,
         file_path: str,
         repo_name: str,
         uri_path: str,
     ) -> Tuple[int, str, str]:
+        """
+        Upload a file (e.g. a report bundle) to artifactory.
+
+        First try a checksum deploy: if artifactory already has the same bytes,
+        the file is deployed without sending any data.
+        Otherwise upload the file with the checksum headers so artifactory can verify what it received.
+        """
         url = f"{self.base_url}/{repo_name}{uri_path}"
         logger.debug(url)
+
+        sha1, sha256 = self._file_checksums(file_path)
+        headers = {
+            "X-Checksum-Sha1": sha1,
+            "X-Checksum-Sha256": sha256,
+        }
+
+        response = self._request_put_upload_file(
+            url=url,
+            file_path=None,
+            headers=dict(headers, **{"X-Checksum-Deploy": "true"}),
+        )
+        if response.status_code >= 200 and response.status_code < 300:
+            logger.info("checksum deploy: %s", url)
+            return response.status_code, response.text, url
+
+        # 404: artifactory does not know this checksum yet
+        logger.debug("checksum deploy failed: %d, upload: %s", response.status_code, url)
+
         response = self._request_put_upload_file(
             url=url,
             file_path=file_path,
+            headers=headers,
         )
         logger.debug("%s", response)
 
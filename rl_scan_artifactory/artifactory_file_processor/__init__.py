@@ -1,8 +1,12 @@
-from .artifactory_file_processor_common import ArtifactoryFileProcessorCommon as ArtifactoryFileProcessorCommon
-from .artifactory_file_processor_default import ArtifactoryFileProcessorDefault as ArtifactoryFileProcessorDefault
-from .artifactory_file_processor_docker import ArtifactoryFileProcessorDocker as ArtifactoryFileProcessorDocker
-from .artifactory_file_processor_generic import ArtifactoryFileProcessorGeneric as ArtifactoryFileProcessorGeneric
+from typing import TYPE_CHECKING
 
+from ..helpers import lazy_module_getattr
+
+if TYPE_CHECKING:
+    from .artifactory_file_processor_common import ArtifactoryFileProcessorCommon as ArtifactoryFileProcessorCommon
+    from .artifactory_file_processor_default import ArtifactoryFileProcessorDefault as ArtifactoryFileProcessorDefault
+    from .artifactory_file_processor_docker import ArtifactoryFileProcessorDocker as ArtifactoryFileProcessorDocker
+    from .artifactory_file_processor_generic import ArtifactoryFileProcessorGeneric as ArtifactoryFileProcessorGeneric
 
 __all__ = [
     "ArtifactoryFileProcessorCommon",
@@ -10,3 +14,13 @@ __all__ = [
     "ArtifactoryFileProcessorDocker",
     "ArtifactoryFileProcessorGeneric",
 ]
+
+__getattr__ = lazy_module_getattr(
+    __name__,
+    {
+        "ArtifactoryFileProcessorCommon": ".artifactory_file_processor_common",
+        "ArtifactoryFileProcessorDefault": ".artifactory_file_processor_default",
+        "ArtifactoryFileProcessorDocker": ".artifactory_file_processor_docker",
+        "ArtifactoryFileProcessorGeneric": ".artifactory_file_processor_generic",
+    },
+)
@@ -20,9 +20,16 @@ from typing import (
 
 import requests
 
+from ..adaptive_concurrency import OPERATION_PROPERTY
 from ..artifactory_api import ArtifactoryApi
 from ..artifactory_repo_info import ArtifactoryRepoInfo
 from ..artifactory_to_portal_base import ArtifactoryToPortalBase
+from ..blob_cache import BlobCache
+from ..repo_db import RepoDb
+from ..digest_index import (
+    DigestEntry,
+    DigestIndex,
+)
 from ..constants import (
     SPECTRA_ASSURE_PRE,
     PROP_NAME_SPECTRA_ASSURE_PROGRESS,
@@ -52,29 +59,18 @@ from ..constants import (
     SECURE_SOFTWARE_COMMUNITY_PACKAGE_TYPES,
     SECURE_SOFTWARE_URL,
 )
+from .. import name_mangler
 from ..exceptions import (
     SpectraAssureInvalidAction,
 )
 from ..file_properties import FilePropertiesCommon
 from ..fileinfo import FileInfo
-from ..name_mangler import (
-    NameManglerDebian,
-    NameManglerDefault,
-    NameManglerDocker,
-    NameManglerGems,
-    NameManglerGeneric,
-    NameManglerMaven,
-    NameManglerNpm,
-    NameManglerPypi,
-    NameManglerRpm,
-)
 from ..spectra_assure_api import SpectraAssureApi
-from ..scan_cli_file import ScanCli
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class PurlInfo:
     project: str | None = None
     package: str | None = None
@@ -105,14 +101,14 @@ class PurlInfo:
         self.package = bb[1]
 
 
-@dataclass
+@dataclass(slots=True)
 class PortalInfo:
     server: str | None = None
     group: str | None = None
     org: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProxyInfo:
     server: str | None = None
     port: str | None = None
@@ -152,7 +148,7 @@ class ProxyInfo:
         return self.proxies
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingInfo:
     completed: bool = False  # if not completed we have a purl, we uploaded for processing, but it is not yet finished
     scan_state: str | None = None  # pass/fail
@@ -173,7 +169,9 @@ class ArtifactoryFileProcessorCommon(
         artifactory_api: ArtifactoryApi,
         repo: ArtifactoryRepoInfo,
         artifact_item: Dict[str, Any],
-        repo_db: Dict[str, Any],  # pass info between file processing; docker list.manifest.json currently
+        repo_db: RepoDb,  # pass info between file processing; docker list.manifest.json currently
+        portal_info: PortalInfo | None = None,  # shared over the run, see make_portal_info()
+        proxy_info: ProxyInfo | None = None,  # shared over the run, see make_proxy_info()
     ) -> None:
         """
         ArtifactoryFileProcessorCommon
@@ -185,6 +183,7 @@ class ArtifactoryFileProcessorCommon(
         - repo:
         - artifact_item:
         - repo_db:
+        - portal_info, proxy_info: created once per run and shared, made from the cli_args if not given
         """
         # -----------------------------
         super().__init__(
@@ -204,11 +203,7 @@ class ArtifactoryFileProcessorCommon(
         self.purl_info = PurlInfo()
         self.max_time: int = self._do_max_time()
 
-        self.portal_info = PortalInfo(
-            server=self.cli_args.get("rlportal_server"),
-            org=self.cli_args.get("rlportal_org"),
-            group=self.cli_args.get("rlportal_group"),
-        )
+        self.portal_info = portal_info if portal_info is not None else self.make_portal_info(self.cli_args)
 
         self.file = FileInfo(
             repo=repo,
@@ -219,14 +214,15 @@ class ArtifactoryFileProcessorCommon(
             file_name=os.path.basename(self.uri),
         )
 
+        # what we had to download for this artifact, counts against the --byte-budget
+        self.processed_bytes: int = int(artifact_item.get("size") or 0)
+
         self.fp: FilePropertiesCommon | None = None
+        self.blob_cache: BlobCache | None = None  # shared between the platform images of one docker index
+        self.digest_index: DigestIndex | None = None  # shared over the whole run with --dedupe-by-digest
+        self.dedupe_digest: str | None = None  # the digest of the bytes we process, see _skip_by_digest()
 
-        self.proxy_info = ProxyInfo(
-            server=self.cli_args.get("proxy_server"),
-            port=self.cli_args.get("proxy_port"),
-            user=self.cli_args.get("proxy_user"),
-            password=self.cli_args.get("proxy_password"),
-        )
+        self.proxy_info = proxy_info if proxy_info is not None else self.make_proxy_info(self.cli_args)
 
         self.processing_info = ProcessingInfo()
         self.what_backend: str = self.do_what_backend()
@@ -241,6 +237,27 @@ class ArtifactoryFileProcessorCommon(
 
         self.need_sync_datetime: bool = False
 
+    @staticmethod
+    def make_portal_info(
+        cli_args: Dict[str, Any],
+    ) -> PortalInfo:
+        return PortalInfo(
+            server=cli_args.get("rlportal_server"),
+            org=cli_args.get("rlportal_org"),
+            group=cli_args.get("rlportal_group"),
+        )
+
+    @staticmethod
+    def make_proxy_info(
+        cli_args: Dict[str, Any],
+    ) -> ProxyInfo:
+        return ProxyInfo(
+            server=cli_args.get("proxy_server"),
+            port=cli_args.get("proxy_port"),
+            user=cli_args.get("proxy_user"),
+            password=cli_args.get("proxy_password"),
+        )
+
     def do_what_backend(
         self,
     ) -> str:
@@ -514,6 +531,59 @@ class ArtifactoryFileProcessorCommon(
         self.purl_info.package = package
         self.purl_info.version = version
 
+    def _set_props_from_digest_entry(
+        self,
+        entry: DigestEntry,
+    ) -> None:
+        recursive, uri = self._what_uri_and_recursive()
+
+        self.set_props_all(
+            report=entry.report,
+            progress="scanned",
+            scan_status=entry.scan_status,
+            recursive=recursive,
+            uri=uri,
+        )
+
+    def _skip_by_digest(
+        self,
+        digest: str | None,
+    ) -> bool:
+        """
+        if the same bytes were already processed in this run, only set the properties.
+
+        returns True if the item is done.
+        """
+        if digest is None or digest in ["", "None"]:
+            return False
+
+        self.dedupe_digest = digest
+        if self.digest_index is None:
+            return False
+
+        if self.cli_args.get("sync", False) or self.need_sync_datetime:
+            return False
+
+        entry = self.digest_index.get(digest)
+        if entry is None:
+            return False
+
+        logger.info("same digest as: %s for: %s::%s", entry.purl, self.file.repo.name, self.uri)
+
+        self.purl_info.from_purl(entry.purl)
+        self.steps["have_package_url"] = True
+
+        self._set_props_from_digest_entry(entry)
+        self.steps["artifactory_properties_exists"] = True
+
+        self.processing_info.completed = True
+        self.processing_info.status = PROCESS_FILE_UPDATED
+        self.processing_info.scan_state = entry.scan_status
+        self.processing_info.report = entry.report
+        self.processing_info.purl = entry.purl
+        self.processing_info.reason = f"same digest as: {entry.purl}"
+        return True
+
     def _handle_progress_present_on_artifactory(
         self,
         progress: str,
@@ -583,7 +653,9 @@ class ArtifactoryFileProcessorCommon(
         assert self.what_backend == "portal"
         assert self.spectra_assure_api is not None
 
-        rr = self.spectra_assure_api.api_client.status(
+        rr = self.spectra_assure_api.call(
+            OPERATION_PROPERTY,
+            self.spectra_assure_api.api_client.status,
             project=project,
             package=package,
             version=version,
@@ -611,7 +683,9 @@ class ArtifactoryFileProcessorCommon(
         purl = self.purl_info.make_purl()
         project, package, version = self._purl_split(purl=purl)
 
-        rr = self.spectra_assure_api.api_client.sync(
+        rr = self.spectra_assure_api.call(
+            OPERATION_PROPERTY,
+            self.spectra_assure_api.api_client.sync,
             project=project,
             package=package,
             version=version,
@@ -824,21 +898,18 @@ class ArtifactoryFileProcessorCommon(
         p_type: str,
     ) -> Tuple[str, str, str]:
         dispatch = {
-            "rpm": NameManglerRpm,
-            "npm": NameManglerNpm,
-            "pypi": NameManglerPypi,
-            "debian": NameManglerDebian,
-            "deb": NameManglerDebian,
-            "maven": NameManglerMaven,
-            "gems": NameManglerGems,
-            "docker": NameManglerDocker,
-            "generic": NameManglerGeneric,
+            "rpm": "NameManglerRpm",
+            "npm": "NameManglerNpm",
+            "pypi": "NameManglerPypi",
+            "debian": "NameManglerDebian",
+            "deb": "NameManglerDebian",
+            "maven": "NameManglerMaven",
+            "gems": "NameManglerGems",
+            "docker": "NameManglerDocker",
+            "generic": "NameManglerGeneric",
         }
 
-        if p_type in dispatch:
-            nm = dispatch[p_type](file=self.file)
-        else:
-            nm = NameManglerDefault(file=self.file)
+        nm = getattr(name_mangler, dispatch.get(p_type, "NameManglerDefault"))(file=self.file)
 
         project, package, version = nm.make_long()
         return project, package, version
@@ -855,6 +926,53 @@ class ArtifactoryFileProcessorCommon(
     ) -> None:
         self.fp = fp
 
+    def set_blob_cache(
+        self,
+        blob_cache: BlobCache,
+    ) -> None:
+        self.blob_cache = blob_cache
+
+    def set_digest_index(
+        self,
+        digest_index: DigestIndex,
+    ) -> None:
+        self.digest_index = digest_index
+
+    def record_digest(
+        self,
+    ) -> None:
+        """after process(): remember a completed scan result for our digest"""
+        if self.digest_index is None or self.dedupe_digest is None:
+            return
+
+        info = self.processing_info
+        if info.completed is False or info.purl is None or info.scan_state is None:
+            return
+
+        if self.know_scan_status(scan_status=info.scan_state) is False:
+            return
+
+        purl = info.purl
+        if purl.startswith("pkg:rl/"):
+            purl = purl[len("pkg:rl/") :]
+        if "@" not in purl or "/" not in purl:
+            return
+
+        report = info.report
+        if report is not None:
+            report = report.strip()
+            if self.what_backend == "portal" and "http" not in report.lower():
+                report = f"{self._portal_make_report_base()}/{report}"
+
+        self.digest_index.add(
+            self.dedupe_digest,
+            DigestEntry(
+                purl=purl,
+                scan_status=info.scan_state,
+                report=report,
+            ),
+        )
+
     def _get_prop_what(
         self,
         what: str,
@@ -913,6 +1031,23 @@ class ArtifactoryFileProcessorCommon(
 
         return False
 
+    def has_work(
+        self,
+    ) -> bool:
+        """
+        Cheap check on the properties only (process() reuses them):
+        False if process() will skip this item, so we do not need a lease for it.
+        """
+        assert self.fp is not None
+        if self.fp.skip_non_candidate_file():
+            return False
+
+        if self.cli_args.get("ignore_artifactory_properties") is False:
+            if self.get_prop_progress() in ["scanned"] and self.sync_possible() is False:
+                return False
+
+        return True
+
     def _portal_make_report_base(
         self,
     ) -> str:
@@ -968,6 +1103,8 @@ class ArtifactoryFileProcessorCommon(
         assert self.what_backend == "cli"
         logger.debug("purl:: %s/%s@%s;; %s", project, package, version, download_path)
 
+        from ..scan_cli_file import ScanCli  # only the cli backend needs the scanner code
+
         self.add_file_to_remove(download_path)
         purl = self.purl_info.make_purl()
         sync_requested = self.cli_args.get("sync", False) or self.need_sync_datetime
@@ -1104,6 +1241,11 @@ class ArtifactoryFileProcessorCommon(
     ) -> Dict[str, Any]:
         raise NotImplementedError
 
+    def extract_docker_image_index(
+        self,
+    ) -> List[str]:
+        raise NotImplementedError
+
     def process(
         self,
     ) -> bool:
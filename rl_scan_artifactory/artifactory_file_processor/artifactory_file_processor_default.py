@@ -6,9 +6,14 @@ from typing import (
 )
 
 
-from .artifactory_file_processor_common import ArtifactoryFileProcessorCommon
+from .artifactory_file_processor_common import (
+    ArtifactoryFileProcessorCommon,
+    PortalInfo,
+    ProxyInfo,
+)
 from ..artifactory_api import ArtifactoryApi
 from ..artifactory_repo_info import ArtifactoryRepoInfo
+from ..repo_db import RepoDb
 from ..constants import (
     PROCESS_FILE_SKIP,
 )
@@ -28,7 +33,9 @@ class ArtifactoryFileProcessorDefault(
         artifactory_api: ArtifactoryApi,
         repo: ArtifactoryRepoInfo,
         artifact_item: Dict[str, Any],
-        repo_db: Dict[str, Any],  # pass infor between file processing; docker list.manifest.json currently
+        repo_db: RepoDb,  # pass infor between file processing; docker list.manifest.json currently
+        portal_info: PortalInfo | None = None,
+        proxy_info: ProxyInfo | None = None,
     ) -> None:
         super().__init__(
             cli_args=cli_args,
@@ -37,6 +44,8 @@ class ArtifactoryFileProcessorDefault(
             repo=repo,
             artifact_item=artifact_item,
             repo_db=repo_db,
+            portal_info=portal_info,
+            proxy_info=proxy_info,
         )
 
     def _process_portal(
@@ -177,6 +186,10 @@ class ArtifactoryFileProcessorDefault(
                 # we can do a sync instead of a scan
                 self.need_sync_datetime = True
                 # return True
+
+        if self._skip_by_digest(self.file.sha2):
+            return True
+
         # -----------------------------
         # get the purl components
         project, package, version = self.get_purl_from_name_mangler(
@@ -7,16 +7,22 @@ import tarfile
 from typing import (
     Any,
     Dict,
+    List,
     Tuple,
 )
 
-from .artifactory_file_processor_common import ArtifactoryFileProcessorCommon
+from .artifactory_file_processor_common import (
+    ArtifactoryFileProcessorCommon,
+    PortalInfo,
+    ProxyInfo,
+)
 from ..artifactory_api import ArtifactoryApi
 from ..artifactory_repo_info import ArtifactoryRepoInfo
 from ..constants import (
     PROCESS_FILE_SKIP,
 )
 from ..docker_manifest_extract import DockerManifestExtract
+from ..repo_db import RepoDb
 from ..spectra_assure_api import SpectraAssureApi
 
 logger = logging.getLogger(__name__)
@@ -33,7 +39,9 @@ class ArtifactoryFileProcessorDocker(
         artifactory_api: ArtifactoryApi,
         repo: ArtifactoryRepoInfo,
         artifact_item: Dict[str, Any],
-        repo_db: Dict[str, Any],  # pass infor between file processing; docker list.manifest.json currently
+        repo_db: RepoDb,  # pass infor between file processing; docker list.manifest.json currently
+        portal_info: PortalInfo | None = None,
+        proxy_info: ProxyInfo | None = None,
     ) -> None:
         super().__init__(
             cli_args=cli_args,
@@ -42,11 +50,19 @@ class ArtifactoryFileProcessorDocker(
             repo=repo,
             artifact_item=artifact_item,
             repo_db=repo_db,
+            portal_info=portal_info,
+            proxy_info=proxy_info,
         )
         self.process_status: str | None = None
         self.docker_version: str | None = None
         self.config_digest_uri: str | None = None
 
+    def _docker_item_url(
+        self,
+        item: str,  # sha256__<hex> next to the manifest.json
+    ) -> str:
+        return f"{self.artifactory_api.get_base_url()}/{self.file.repo.name}{self.up_uri}/{item}"
+
     def _process_one_docker_manifest_item(
         self,
         item: str,
@@ -59,7 +75,7 @@ class ArtifactoryFileProcessorDocker(
         logger.debug("%s; %s", item, data)
 
         item_uri = "/".join([self.up_uri, item])
-        url = f"{self.artifactory_api.get_base_url()}/{self.file.repo.name}{item_uri}"
+        url = self._docker_item_url(item)
 
         t = "_".join(item_uri.split("/"))
         target_path = f"{self.download_dir}/{t}"
@@ -67,51 +83,90 @@ class ArtifactoryFileProcessorDocker(
 
         logger.debug("%s %s %s", url, target_path, sha256)
 
-        download_path, verify_ok = self.artifactory_api.download_url_to_target_with_verify(
-            url=url,
-            target_path=target_path,
-            sha256=sha256,
-        )
+        def download() -> Tuple[str | None, bool]:
+            return self.artifactory_api.download_url_to_target_with_verify(
+                url=url,
+                target_path=target_path,
+                sha256=sha256,
+            )
+
+        if self.blob_cache is not None:
+            # platform images of one index share blobs, the cache removes them when the index is done
+            return self.blob_cache.fetch(item, download)
 
+        download_path, verify_ok = download()
         if download_path:
             self.add_file_to_remove(download_path)
 
         return download_path, verify_ok
 
-    def _process_one_docker_manifest_json(
+    def _download_docker_manifest_items(
         self,
-        target_path: str,  # path may be relative
-    ) -> DockerManifestExtract | None:
-        dme = DockerManifestExtract(
-            file_path=target_path,
-        )
-
-        items = dme.get_items()
-        logger.debug("items: %s", items)
-
-        # now look for the sha256__ files on the same level as the manifest.json and download
-        output: Dict[str, str] = {}
+        dme: DockerManifestExtract,
+        items: Dict[str, Any],
+    ) -> bool:
+        """download the sha256__ files on the same level as the manifest.json that we do not have yet"""
+        output: Dict[str, str] = dict(dme.output)
         for item, data in items.items():
+            if item in output:
+                continue
+
             download_path, verify_ok = self._process_one_docker_manifest_item(
                 item=item,
                 data=data,
             )  # download happens here
             if download_path is None:
-                return None
+                return False
 
             if verify_ok is False:
                 logger.error("verify failed for %s", download_path)
-                return None
+                return False
 
             output[item] = download_path
 
         logger.debug("output: %s", output)
-        if len(output) == 0:
+        dme.set_output(output)
+        return len(output) > 0
+
+    def _process_one_docker_manifest_json(
+        self,
+        target_path: str,  # path may be relative
+        data: Dict[str, Any] | None = None,  # the manifest if we have it in memory
+    ) -> DockerManifestExtract | None:
+        """
+        phase 1: parse the manifest.json, the (small) config is read in _read_config_digest_docker(),
+        that is all we need for the purl; the layers follow in _download_docker_layers() only if we must upload or scan.
+        """
+        dme = DockerManifestExtract(
+            file_path=target_path,
+            data=data,
+        )
+
+        items = dme.get_items()
+        logger.debug("items: %s", items)
+
+        config_digest = dme.get_config_digest()
+        if config_digest is None:
+            return None
+
+        if "__".join(config_digest.split(":")) not in items:
             return None
 
-        dme.set_output(output)
         return dme
 
+    def _download_docker_layers(
+        self,
+        dme: DockerManifestExtract,
+    ) -> bool:
+        """phase 2: download the config and the layers, we need the full image for the upload or the scan"""
+        items = dme.get_items()
+        ok = self._download_docker_manifest_items(dme, items)
+        if ok:
+            # the manifest.json is small, the image is the config and the layers
+            self.processed_bytes = sum(int(data.get("size") or 0) for data in items.values())
+
+        return ok
+
     @staticmethod
     def _docker_make_target_name(
         input_name: str,
@@ -135,23 +190,37 @@ class ArtifactoryFileProcessorDocker(
     def _read_config_digest_docker(
         self,
         config_digest: str,
+        dme: DockerManifestExtract,
     ) -> Dict[str, Any] | None:
         # prep
         self.make_config_uri(config_digest)
 
-        base_a = self.uri.split("/")[:-1]
-        cd_a = config_digest.split(":")
-        config_digest_file_path = self.download_dir + "/" + "_".join(base_a) + "_" + "__".join(cd_a)
-
         # if we block the config_file we block the docker download
         logger.debug("%s", self.config_digest_uri)
 
-        # read
-        try:
-            with open(config_digest_file_path, mode="r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            logger.exception("can not read the json file at: %s; %s", config_digest_file_path, e)
+        config_key = "__".join(config_digest.split(":"))
+        data, verify_ok = self.artifactory_api.fetch_small_json(
+            url=self._docker_item_url(config_key),
+            sha256=config_digest.split(":")[1],
+        )
+
+        if data is None or verify_ok is False:
+            # too large for memory: download to file (the file is needed later for the tar anyway)
+            items = dme.get_items()
+            if self._download_docker_manifest_items(dme, {config_key: items[config_key]}) is False:
+                logger.error("config %s not downloaded for: %s", config_digest, self.uri)
+                return None
+
+            config_digest_file_path = dme.output[config_key]
+            try:
+                with open(config_digest_file_path, mode="r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.exception("can not read the json file at: %s; %s", config_digest_file_path, e)
+                return None
+
+        if not isinstance(data, dict):
+            logger.error("config %s is not a json object for: %s", config_digest, self.uri)
             return None
 
         # normalize type
@@ -238,7 +307,7 @@ class ArtifactoryFileProcessorDocker(
         version: str,
         dme: DockerManifestExtract,
         arch: str,
-        target_path: str,
+        target_path: str | None,  # the manifest.json file, None if we read it into memory
     ) -> Tuple[bool, str]:
         # purl = self.purl_info.make_purl()
 
@@ -249,6 +318,10 @@ class ArtifactoryFileProcessorDocker(
         )
 
         for item in list(dme.output.values()) + [target_path, tarfile_name]:
+            if item is None:
+                continue
+            if self.blob_cache is not None and self.blob_cache.owns(item):
+                continue
             self.add_file_to_remove(item=item)
 
         try:
@@ -270,7 +343,7 @@ class ArtifactoryFileProcessorDocker(
         version: str,
         arch: str,
         dme: DockerManifestExtract,
-        target_path: str,
+        target_path: str | None,
     ) -> bool:
         purl = self.purl_info.make_purl()
 
@@ -313,18 +386,34 @@ class ArtifactoryFileProcessorDocker(
 
     def _get_list_manifest_json_docker(
         self,
-    ) -> None:
+    ) -> List[str]:
+        """
+        download the image index and remember each platform manifest in the repo_db,
+        return the uri of all platform manifest.json files of this index.
+        """
         # download and get version/latest from path, collect hash info and architecture/os/variant
         uri = self.uri
         logger.debug("%s", uri)
-        download_path, verify_ok = self.artifactory_api.download_one_file_with_verify(
-            file=self.file,
-            download_dir=self.download_dir,
+        data, verify_ok = self.artifactory_api.fetch_small_json(
+            url=self.artifactory_api.get_file_url(self.file),
+            sha256=self.file.sha2,
         )
-        logger.debug("%s -> %s, %s", uri, download_path, verify_ok)
+        if data is None:
+            # too large for memory: download to file
+            download_path, verify_ok = self.artifactory_api.download_one_file_with_verify(
+                file=self.file,
+                download_dir=self.download_dir,
+            )
+            logger.debug("%s -> %s, %s", uri, download_path, verify_ok)
 
-        assert download_path is not None
-        data = self._read_file_json_docker(download_path=download_path)
+            assert download_path is not None
+            data = self._read_file_json_docker(download_path=download_path)
+            self.add_file_to_remove(item=download_path)
+
+        # /<image>/<tag>/list.manifest.json has its platform images in /<image>/sha256__<hex>/manifest.json
+        image_path = "/".join(uri.split("/")[:-2])
+
+        platform_uris: List[str] = []
         manifests = data.get("manifests", [])
         for manifest in manifests:
             manifest["__uri__"] = uri.split("/")
@@ -334,8 +423,9 @@ class ArtifactoryFileProcessorDocker(
                 assert key is not None
                 if key not in self.repo_db:
                     self.repo_db[key] = manifest
+                platform_uris.append(f"{image_path}/{key}/manifest.json")
 
-        self.add_file_to_remove(item=download_path)
+        return platform_uris
 
     def _try_extract_version_from_manifest_uri_and_repo_db(
         self,
@@ -416,6 +506,11 @@ class ArtifactoryFileProcessorDocker(
             is_uploaded = False
 
         if is_uploaded is False:
+            if self._download_docker_layers(self.file.simple["dme"]) is False:
+                self.processing_info.reason = f"cannot download the layers of: {self.uri}"
+                self.processing_info.completed = True
+                return True
+
             is_uploaded = self._upload_docker_tarfile(
                 project=project,
                 package=package,
@@ -444,7 +539,15 @@ class ArtifactoryFileProcessorDocker(
         arch = self.file.simple["arch"][0]
         dme = self.file.simple["dme"]
         download_path = self.file.simple["download_path"]
-        self.add_file_to_remove(download_path)
+        if download_path is not None:
+            self.add_file_to_remove(download_path)
+
+        if self._download_docker_layers(dme) is False:
+            self.processing_info.completed = True
+            self.processing_info.status = PROCESS_FILE_SKIP
+            self.processing_info.reason = f"cannot download the layers of: {self.uri}"
+            self.processing_info.purl = purl
+            return True
 
         # sync_requested = self.cli_args.get("sync", False) or self.need_sync_datetime
         # for now just keep the downloaded file even if we dont actually need it for sync
@@ -476,6 +579,25 @@ class ArtifactoryFileProcessorDocker(
 
     # PUBLIC
 
+    def extract_docker_image_index(
+        self,
+    ) -> List[str]:
+        """
+        Read a list.manifest.json (multi platform image index),
+        collect the platform info in the repo_db and
+        return the uri of the manifest.json of every platform image in this index.
+        """
+        assert self.filename.lower() == "list.manifest.json"
+        return self._get_list_manifest_json_docker()
+
+    def has_work(
+        self,
+    ) -> bool:
+        # a list.manifest.json is only read for info, the platform manifest.json files are the real work
+        if self.filename.lower() != "manifest.json":
+            return False
+        return super().has_work()
+
     def process(  # noqa: C901
         self,
     ) -> bool:
@@ -484,9 +606,11 @@ class ArtifactoryFileProcessorDocker(
         1. we have a path to a manifest.json.
         2. we need to find the architecture and os to make a unique purl.
         3. that info is in the actual build file only (the config part of the manifest).
-        4. we download the config file and all the layers.
+        4. we download only the config file.
         5. we parse the config to extract architecture and os.
-        6. once we have all that we bundle config and layers into a tar that we can upload.
+        6. once we have the purl we check the portal, the properties and the digest index,
+           only if we must upload or scan we download all the layers
+           and bundle config and layers into a tar.
         7. the purl will be <repo-name>.<os>-<arch>/<path1>_<path2>@<version-or-latest>
         8. there is no version in the manifest ,
             unless we have "annotations" in the manifest.json and "org.opencontainers.image.version"
@@ -550,29 +674,36 @@ class ArtifactoryFileProcessorDocker(
         # (neither scanned nor uploaded) or ignore
         logger.debug("prep for download&upload: docker uri: %s, %s", self.uri, self.file)
 
-        target_name = self._docker_make_target_name(
-            input_name=self.uri,
+        download_path: str | None = None
+        manifest_data, verify_ok = self.artifactory_api.fetch_small_json(
+            url=self.artifactory_api.get_file_url(self.file),
+            sha256=self.file.sha2,
         )
-        if target_name:
-            self.add_file_to_remove(target_name)
+        if manifest_data is None:
+            # too large for memory: download to file
+            target_name = self._docker_make_target_name(
+                input_name=self.uri,
+            )
+            if target_name:
+                self.add_file_to_remove(target_name)
 
-        download_path, verify_ok = self._do_one_artifactory_download(
-            target_name=target_name,
-        )
-        if download_path:
-            self.add_file_to_remove(download_path)
+            download_path, verify_ok = self._do_one_artifactory_download(
+                target_name=target_name,
+            )
+            if download_path:
+                self.add_file_to_remove(download_path)
 
-        if download_path is None:
-            msg = f"download failed file for: {download_path}"
-            self.processing_info.reason = msg
-            return True
+            if download_path is None:
+                msg = f"download failed file for: {self.uri}"
+                self.processing_info.reason = msg
+                return True
 
         if verify_ok is False:
-            msg = f"verify failed file for: {download_path}"
+            msg = f"verify failed file for: {self.uri}"
             self.processing_info.reason = msg
             return True
 
-        # we now have a downloaded file (manifest.json) but still no purl info
+        # we now have the manifest.json but still no purl info
         # -------------------------------------
         """
         With the manifest.json as the start of the journey,
@@ -597,14 +728,18 @@ class ArtifactoryFileProcessorDocker(
         but a annotation may create a more distinct version string.
         """
 
-        dme = self._process_one_docker_manifest_json(  # downloads layers and config
-            target_path=download_path,
+        dme = self._process_one_docker_manifest_json(  # the config and the layers come later
+            target_path=download_path or self.uri,
+            data=manifest_data,
         )
         if dme is None:
             msg = f"cannot extract info from manifest.json for uri: {self.uri}"
             self.processing_info.reason = msg
             return True
 
+        # the manifest.json is small, until we need the layers we only have the config
+        self.processed_bytes = int(dme.config.get("size") or 0)
+
         config_digest = dme.get_config_digest()
         if config_digest is None:
             msg = f"cannot extract 'config_digest' from manifest.json for uri: {self.uri}"
@@ -618,12 +753,16 @@ class ArtifactoryFileProcessorDocker(
             dme.annotations,
         )
 
-        config_data = self._read_config_digest_docker(config_digest)
+        config_data = self._read_config_digest_docker(config_digest, dme)
         if config_data is None:
             msg = f"cannot extract 'config_data' from {config_digest} via manifest.json for uri: {self.uri}"
             self.processing_info.reason = msg
             return True
 
+        # the same image under a other tag or in a other repo has the same config digest
+        if self._skip_by_digest(config_digest):
+            return True
+
         # ===============================================
         # a docker image may have a architecture
         self.file.last_modified = config_data.get("created", "")
@@ -8,9 +8,14 @@ from typing import (
     Tuple,
 )
 
-from .artifactory_file_processor_common import ArtifactoryFileProcessorCommon
+from .artifactory_file_processor_common import (
+    ArtifactoryFileProcessorCommon,
+    PortalInfo,
+    ProxyInfo,
+)
 from ..artifactory_api import ArtifactoryApi
 from ..artifactory_repo_info import ArtifactoryRepoInfo
+from ..digest_index import DigestEntry
 from ..constants import (
     PROCESS_FILE_SKIP,
     META_STRING,
@@ -22,6 +27,7 @@ from ..constants import (
     PROCESS_FILE_TIMEOUT,
 )
 from ..exceptions import SpectraAssureInvalidAction
+from ..repo_db import RepoDb
 from ..spectra_assure_api import SpectraAssureApi
 
 logger = logging.getLogger(__name__)
@@ -68,7 +74,9 @@ class ArtifactoryFileProcessorGeneric(
         artifactory_api: ArtifactoryApi,
         repo: ArtifactoryRepoInfo,
         artifact_item: Dict[str, Any],
-        repo_db: Dict[str, Any],  # pass infor between file processing; docker list.manifest.json currently
+        repo_db: RepoDb,  # pass infor between file processing; docker list.manifest.json currently
+        portal_info: PortalInfo | None = None,
+        proxy_info: ProxyInfo | None = None,
     ) -> None:
         super().__init__(
             cli_args=cli_args,
@@ -77,6 +85,8 @@ class ArtifactoryFileProcessorGeneric(
             repo=repo,
             artifact_item=artifact_item,
             repo_db=repo_db,
+            portal_info=portal_info,
+            proxy_info=proxy_info,
         )
 
     @staticmethod
@@ -153,31 +163,38 @@ class ArtifactoryFileProcessorGeneric(
     def _load_meta_info(
         self,
     ) -> Tuple[bool, Any]:
-        """Download the meta file and extract ist info"""
+        """Fetch the meta file (into memory if small, as they normally are) and extract ist info"""
         is_downloaded = False
 
-        aa = self.uri.split("/")
-        target_name = aa[-1]
-        assert target_name is not None
-        download_path, verify_ok = self._do_one_artifactory_download(
-            target_name=target_name,
+        config = configparser.ConfigParser()
+
+        data, _ = self.artifactory_api.fetch_small_object(
+            url=self.artifactory_api.get_file_url(self.file),
+            sha256=self.file.sha2,
         )
+        if data is not None:
+            config.read_string(data.decode("utf-8"))
+        else:
+            # meta files are read concurrently and many have the same name, use the full path
+            target_name = "_".join(self.uri.split("/"))
+            download_path, verify_ok = self._do_one_artifactory_download(
+                target_name=target_name,
+            )
 
-        if download_path is None:
-            logger.error("download failed file for: %s", download_path)
-            return is_downloaded, None
+            if download_path is None:
+                logger.error("download failed file for: %s", self.uri)
+                return is_downloaded, None
 
-        config = configparser.ConfigParser()
-        config.read(download_path)
+            config.read(download_path)
+            self._remove_files([download_path])
 
         if self.rl_meta not in config:
-            logger.error("missing %s in meta file", self.rl_meta, download_path)
+            logger.error("missing %s in meta file: %s", self.rl_meta, self.uri)
             return is_downloaded, None
 
         meta = self._make_meta_dict(config=config)
         self._verify_mandatory(meta=meta)
         self._set_purl_data(meta=meta)
-        self._remove_files([download_path])
 
         return True, meta
 
@@ -215,6 +232,25 @@ class ArtifactoryFileProcessorGeneric(
                 uri=uri2,
             )
 
+    def _set_props_from_digest_entry(
+        self,
+        entry: DigestEntry,
+    ) -> None:
+        uris = [self.uri]
+        if self.cli_args.get("portal"):
+            aa = self.uri.split("/")
+            aa[-1] = self.file.properties[f"{self.what}.{self.derived}.path"]
+            uris.append("/".join(aa))
+
+        for uri in uris:
+            self.set_props_all(
+                report=entry.report,
+                progress="scanned",
+                scan_status=entry.scan_status,
+                recursive=False,
+                uri=uri,
+            )
+
     def _wait_for_scan_status_one_portal(
         self,
     ) -> bool:
@@ -444,6 +480,10 @@ class ArtifactoryFileProcessorGeneric(
             self.processing_info.purl = None
             return True
 
+        # the meta file describes the real file, dedupe on the digest of the real file
+        if self._skip_by_digest(self.file.properties.get(f"{self.what}.{self.derived}.sha256")):
+            return True
+
         assert self.purl_info.project is not None
         assert self.purl_info.package is not None
         assert self.purl_info.version is not None
@@ -550,6 +590,9 @@ class ArtifactoryFileProcessorGeneric(
         self.steps["artifactory_properties_exists"] = False
         logger.debug("inspect %s", self.uri)
 
+        if self._skip_by_digest(self.file.sha2):
+            return True
+
         # for generic
         meta_info = {
             "project": self.file.repo.name,
@@ -11,7 +11,7 @@ from typing import (
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ArtifactoryRepoInfo:
     name: str
     repo_type: str
@@ -1,18 +1,32 @@
 # python3 ts=4space
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
     Dict,
+    Iterable,
     List,
+    Set,
 )
 
 from .artifactory_api import ArtifactoryApi
 from .artifactory_repo_info import ArtifactoryRepoInfo
 from .artifactory_to_portal_base import ArtifactoryToPortalBase
+from .candidate_filter import CandidateFilter
 from .constants import (
+    AQL_ITEM_FIELDS,
+    AQL_PAGE_SIZE,
     ARTIFACTORY_KNOWN_PACKAGE_TYPES,
+    DOCKER_MANIFEST_FILES,
+    LISTING_ITEM_FIELDS,
+    META_STRING,
+    PROP_NAME_SPECTRA_ASSURE_PROGRESS,
+    RPM_WARMUP_WORKERS,
 )
+from .fileinfo import FileInfo
+from .scheduler import schedule_items
 from .spectra_assure_api import SpectraAssureApi
+from .watermark import newest_modified
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +51,13 @@ class ArtifactoryRepoProcessor(
             repo_name=repo_name,
         )
         self.p_type = self.repo.package_type.lower()
+        self.newest_modified: str | None = None  # of the listed items, for the next --watermark run
+        self.candidate_filter = CandidateFilter(
+            p_type=self.p_type,
+            cli_mode=self.cli_args.get("cli") is True,
+            include=self.cli_args.get("include"),
+            exclude=self.cli_args.get("exclude"),
+        )
 
     def _make_repo_info(
         self,
@@ -56,50 +77,210 @@ class ArtifactoryRepoProcessor(
 
         return repo
 
+    def _rpm_uris_with_metadata(
+        self,
+    ) -> Set[str] | None:
+        """the uri of all rpm files that already have rpm.metadata.name; None if aql is not available"""
+        criteria: Dict[str, Any] = {
+            "repo": self.artifactory_api.aql_repo_name(self.repo),
+            "type": "file",
+            "name": {"$match": "*.rpm"},
+            "@rpm.metadata.name": {"$match": "*"},
+        }
+        items = self.artifactory_api.find_items_aql(
+            criteria=criteria,
+            include=["repo", "path", "name"],
+            page_size=AQL_PAGE_SIZE,
+        )
+        if items is None:
+            return None
+
+        return {self.artifactory_api.aql_item_to_list_item(item)["uri"] for item in items}
+
+    def _rpm_warm_up_one(
+        self,
+        artifact_item: Dict[str, Any],
+        check_first: bool,
+    ) -> bool:
+        file = FileInfo(
+            repo=self.repo,
+            uri=str(artifact_item.get("uri")),
+            sha1=str(artifact_item.get("sha1")),
+            sha2=str(artifact_item.get("sha2")),
+            last_modified=artifact_item.get("lastModified", ""),
+        )
+
+        if check_first:
+            props = self.artifactory_api.get_item_properties(file=file)
+            if props.get("rpm.metadata.name") and props.get("rpm.metadata.version"):
+                return False
+
+        return self.artifactory_api.touch_rpm_info_uri(file=file)
+
     def extract_my_interesting_files(
         self,
         one_repo_list: Dict[str, Any],
     ) -> List[Dict[str, Any]]:
+        return self._extract_interesting_files(one_repo_list.get("files", []))
+
+    def _extract_interesting_files(
+        self,
+        files: Iterable[Dict[str, Any]],  # a list or the items of a streamed listing
+    ) -> List[Dict[str, Any]]:
+        is_candidate = self.candidate_filter.is_candidate
+
+        n = 0
         my_interesting_files: List[Dict[str, Any]] = []
+        for item in files:
+            n += 1
+            if is_candidate(item.get("uri", "")):
+                my_interesting_files.append({k: item[k] for k in LISTING_ITEM_FIELDS if k in item})
 
-        for item in one_repo_list.get("files", []):
-            if not (self.p_type == "generic" and self.cli_args.get("cli")):
-                # only ends with (if defined)
-                ew = ARTIFACTORY_KNOWN_PACKAGE_TYPES[self.p_type].get("endswith", "")
-                if len(ew) > 0:
-                    if not item.get("uri", "").endswith(ew):
-                        continue
+        logger.debug("candidates: %d of %d", len(my_interesting_files), n)
+        return my_interesting_files
+
+    def _make_file_list_docker_aql(
+        self,
+        repo: ArtifactoryRepoInfo,
+    ) -> List[Dict[str, Any]] | None:
+        """
+        A docker repo is mostly layer blobs, ask artifactory only for the manifest files.
+        returns None if aql is not available.
+        """
+        criteria: Dict[str, Any] = {
+            "repo": self.artifactory_api.aql_repo_name(repo),
+            "type": "file",
+            "$or": [{"name": name} for name in DOCKER_MANIFEST_FILES],
+        }
 
-                # skip specific items not endswith (if defined)
-                not_ew = ARTIFACTORY_KNOWN_PACKAGE_TYPES[self.p_type].get("not_endswith", "")
-                if len(not_ew) > 0:
-                    if item.get("uri", "").endswith(not_ew):
-                        continue
+        items = self.artifactory_api.find_items_aql(
+            criteria=criteria,
+            include=AQL_ITEM_FIELDS,
+            page_size=AQL_PAGE_SIZE,
+        )
+        if items is None:
+            return None
 
-            logger.debug("append %s", item)
-            my_interesting_files.append(item)
+        files = [self.artifactory_api.aql_item_to_list_item(item) for item in items]
+        return self.extract_my_interesting_files({"files": files})
 
-        return my_interesting_files
+    def _make_file_list_since_aql(
+        self,
+        repo: ArtifactoryRepoInfo,
+        since: str,
+    ) -> List[Dict[str, Any]] | None:
+        """
+        Only the files modified after 'since' and the files still waiting for the portal scan.
+        returns None if aql is not available.
+        """
+        changed: List[Dict[str, Any]] = [
+            {"modified": {"$gt": since}},
+            {f"@{PROP_NAME_SPECTRA_ASSURE_PROGRESS}": "upload_to_portal_ok"},
+        ]
+        if self.p_type == "generic":
+            changed.append(
+                {"name": {"$match": f"*{META_STRING}"}}
+            )  # the purl of a changed file may be in a old meta file
+
+        criteria: Dict[str, Any] = {
+            "repo": self.artifactory_api.aql_repo_name(repo),
+            "type": "file",
+            "$or": changed,
+        }
+        if self.p_type == "docker":
+            criteria["name"] = {"$match": "*manifest.json"}  # manifest.json and list.manifest.json
+
+        items = self.artifactory_api.find_items_aql(
+            criteria=criteria,
+            include=AQL_ITEM_FIELDS,
+            page_size=AQL_PAGE_SIZE,
+        )
+        if items is None:
+            return None
+
+        files = [self.artifactory_api.aql_item_to_list_item(item) for item in items]
+
+        if self.p_type == "docker":
+            # a changed platform manifest.json is processed with its image index, that may not have changed
+            index_files = self._make_file_list_docker_index_aql(repo, files)
+            if index_files is None:
+                return None
+            files.extend(index_files)
+
+        return self.extract_my_interesting_files({"files": files})
+
+    def _make_file_list_docker_index_aql(
+        self,
+        repo: ArtifactoryRepoInfo,
+        files: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]] | None:
+        """
+        The list.manifest.json files in the image paths of the platform manifests in files
+        (/<image>/sha256__<hex>/manifest.json -> /<image>/<tag>/list.manifest.json), if not in files already.
+        returns None if aql is not available.
+        """
+        known = {item.get("uri", "") for item in files}
+
+        image_paths: Set[str] = set()
+        for uri in known:
+            aa = uri.split("/")
+            if len(aa) > 3 and aa[-1] == "manifest.json" and aa[-2].startswith("sha256__"):
+                image_paths.add("/".join(aa[1:-2]))
+
+        if len(image_paths) == 0:
+            return []
+
+        criteria: Dict[str, Any] = {
+            "repo": self.artifactory_api.aql_repo_name(repo),
+            "type": "file",
+            "name": "list.manifest.json",
+            "$or": [{"path": {"$match": f"{image_path}/*"}} for image_path in sorted(image_paths)],
+        }
+
+        items = self.artifactory_api.find_items_aql(
+            criteria=criteria,
+            include=AQL_ITEM_FIELDS,
+            page_size=AQL_PAGE_SIZE,
+        )
+        if items is None:
+            return None
+
+        index_files = [self.artifactory_api.aql_item_to_list_item(item) for item in items]
+        return [item for item in index_files if item["uri"] not in known]
 
     def _make_file_list_one_repo(
         self,
         repo: ArtifactoryRepoInfo,
+        since: str | None = None,
     ) -> List[Dict[str, Any]]:
         if self.p_type not in ARTIFACTORY_KNOWN_PACKAGE_TYPES:
             return []
 
+        if since is not None:
+            changed_files = self._make_file_list_since_aql(repo, since)
+            if changed_files is not None:
+                return changed_files
+            logger.info("no aql for repo: %s, ignore the watermark and use the full listing", repo.name)
+
+        if self.p_type == "docker":
+            docker_files = self._make_file_list_docker_aql(repo)
+            if docker_files is not None:
+                return docker_files
+            logger.info("no aql for repo: %s, fall back to the full storage listing", repo.name)
+
         qp: Dict[str, Any] = {
             "deep": 1,
             "mdTimestamps": 0,
             "listFolders": 0,
         }
 
-        one_repo_list = self.artifactory_api.list_repo_items(
+        # the listing is filtered while it streams in, only the candidates are kept
+        files = self.artifactory_api.iter_repo_items(
             repo=repo,
             qp=qp,
         )
 
-        return self.extract_my_interesting_files(one_repo_list)
+        return self._extract_interesting_files(files)
 
     # PUBLIC
 
@@ -113,9 +294,40 @@ class ArtifactoryRepoProcessor(
     ) -> str:
         return self.p_type
 
+    def warm_up_rpm_metadata(
+        self,
+        artifact_items: List[Dict[str, Any]],
+        workers: int = RPM_WARMUP_WORKERS,
+    ) -> int:
+        """
+        Artifactory populates the rpm.metadata.* properties of a (remote) rpm only after the rpm info is requested.
+        Request it for all rpm files that lack the metadata in parallel,
+        so the main pass finds the properties and does not have to do it one file at a time.
+        Returns the number of rpm files we requested the info for.
+        """
+        have_metadata = self._rpm_uris_with_metadata()
+        check_first = have_metadata is None  # without aql look at the properties of every rpm
+        skip = have_metadata or set()
+        todo = [item for item in artifact_items if item.get("uri", "").endswith(".rpm") and item.get("uri") not in skip]
+        if len(todo) == 0:
+            return 0
+
+        def warm_up_one(artifact_item: Dict[str, Any]) -> bool:
+            return self._rpm_warm_up_one(artifact_item, check_first)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            n = len([touched for touched in executor.map(warm_up_one, todo) if touched])
+
+        logger.info("rpm warm-up: %s; requested the rpm info for %d of %d rpm files", self.repo.name, n, len(todo))
+        return n
+
     def process(
         self,
+        since: str | None = None,  # watermark: only items modified after this and the ones pending on the portal
     ) -> List[Dict[str, Any]]:
-        return self._make_file_list_one_repo(
+        items = self._make_file_list_one_repo(
             repo=self.repo,
+            since=since,
         )
+        self.newest_modified = newest_modified(items, since)
+        return schedule_items(items, self.cli_args.get("schedule"))
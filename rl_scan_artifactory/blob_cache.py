@@ -0,0 +1,86 @@
+# python3 ts=4space
+import logging
+import os
+import threading
+from typing import (
+    Callable,
+    Dict,
+    Set,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+A docker image index (list.manifest.json) points to one manifest per platform,
+the platform images very often share their base layers.
+
+The BlobCache lets all platform images of one index download a shared blob only once:
+the first caller for a digest does the download, all other callers wait for that result.
+The downloaded files belong to the cache and are removed by cleanup(),
+after all platform images of the index are done.
+"""
+
+
+class _BlobEntry:
+    def __init__(
+        self,
+    ) -> None:
+        self.done = threading.Event()
+        self.download_path: str | None = None
+        self.verify_ok: bool = False
+
+
+class BlobCache:
+    def __init__(
+        self,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _BlobEntry] = {}
+        self._paths: Set[str] = set()  # the download paths of all entries, for owns()
+
+    def fetch(
+        self,
+        digest: str,
+        download: Callable[[], Tuple[str | None, bool]],
+    ) -> Tuple[str | None, bool]:
+        """return (download_path, verify_ok) for digest, download only on first request"""
+        with self._lock:
+            entry = self._entries.get(digest)
+            owner = entry is None
+            if entry is None:
+                entry = _BlobEntry()
+                self._entries[digest] = entry
+
+        if owner:
+            try:
+                entry.download_path, entry.verify_ok = download()
+                if entry.download_path is not None:
+                    with self._lock:
+                        self._paths.add(entry.download_path)
+            finally:
+                entry.done.set()
+        else:
+            logger.debug("reuse blob: %s", digest)
+            entry.done.wait()
+
+        return entry.download_path, entry.verify_ok
+
+    def owns(
+        self,
+        path: str,
+    ) -> bool:
+        with self._lock:
+            return path in self._paths
+
+    def cleanup(
+        self,
+    ) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries = {}
+            self._paths = set()
+
+        for entry in entries:
+            if entry.download_path and os.path.exists(entry.download_path):
+                os.remove(entry.download_path)
@@ -0,0 +1,81 @@
+# python3 ts=4space
+import fnmatch
+import logging
+import re
+from typing import (
+    List,
+    Pattern,
+)
+
+from .constants import (
+    ARTIFACTORY_KNOWN_PACKAGE_TYPES,
+    CLI_REPORTS_FILE_TAIL,
+    META_STRING,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+Select the candidate files from a repo listing in one pass.
+
+All rules for a repo are prepared once:
+ - the package type 'endswith' and 'not_endswith' suffixes (not for generic with cli, that scans all files),
+ - the report files we uploaded ourselves with cli are never candidates,
+ - the --include and --exclude globs, each list compiled to one regex.
+The globs match the uri without the leading '/', '*' also matches '/';
+.rl_meta files are never dropped by --include as generic repos need them for the purl.
+"""
+
+
+def _compile_globs(
+    globs: List[str],
+) -> Pattern[str] | None:
+    if len(globs) == 0:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(g)})" for g in globs))
+
+
+class CandidateFilter:
+    def __init__(
+        self,
+        *,
+        p_type: str,
+        cli_mode: bool = False,
+        include: List[str] | None = None,
+        exclude: List[str] | None = None,
+    ) -> None:
+        self.endswith: tuple[str, ...] = ()
+        self.not_endswith: tuple[str, ...] = ()
+
+        if not (p_type == "generic" and cli_mode):
+            rules = ARTIFACTORY_KNOWN_PACKAGE_TYPES.get(p_type, {})
+            self.endswith = tuple(s for s in [rules.get("endswith", "")] if len(s) > 0)
+            self.not_endswith = tuple(s for s in [rules.get("not_endswith", "")] if len(s) > 0)
+
+        self.include = _compile_globs(include or [])
+        self.exclude = _compile_globs(exclude or [])
+
+    def is_candidate(
+        self,
+        uri: str,
+    ) -> bool:
+        if self.endswith and not uri.endswith(self.endswith):
+            return False
+
+        if self.not_endswith and uri.endswith(self.not_endswith):
+            return False
+
+        uri_l = uri.lower()
+        if uri_l.endswith(CLI_REPORTS_FILE_TAIL):
+            # during internal testing we mix portal and cli in the same artifactory instance
+            # so skip the report tails always
+            return False
+
+        path = uri.lstrip("/")
+        if self.exclude is not None and self.exclude.match(path):
+            return False
+
+        if self.include is not None and not uri_l.endswith(META_STRING) and not self.include.match(path):
+            return False
+
+        return True
@@ -140,6 +140,10 @@ PROP_NAME_SPECTRA_ASSURE_SCAN_REPORT = f"{SPECTRA_ASSURE_PRE}.scan-report"
 PROP_NAME_SPECTRA_ASSURE_ORG = f"{SPECTRA_ASSURE_PRE}.organization"
 PROP_NAME_SPECTRA_ASSURE_GROUP = f"{SPECTRA_ASSURE_PRE}.group"
 PROP_NAME_SPECTRA_ASSURE_NOSCAN = f"{SPECTRA_ASSURE_PRE}.noscan"
+PROP_NAME_SPECTRA_ASSURE_LEASE = f"{SPECTRA_ASSURE_PRE}.lease"  # --lease: <owner>:<expiry>, not a scan result
+
+LEASE_TTL: int = 3600  # seconds
+LEASE_VERIFY_WAIT: float = 1.0  # seconds between setting the lease and reading it back
 
 PROP_SPECTRA_ASSURE_ALL = [
     PROP_NAME_SPECTRA_ASSURE_PROGRESS,
@@ -176,11 +180,70 @@ PORTAL_UPLOAD_TIMEOUT: int = 3600 * 2
 ARTIFACTORY_DOWNLOAD_TIMEOUT: int = 3600 * 2
 VERIFY_BUF_SIZE: int = 65536
 
+# manifests, docker configs and .rl_meta files up to this size are fetched into memory, not into a temp file
+SMALL_OBJECT_MAX_SIZE: int = 1024 * 1024
+
 DEFAULT_DIGEST_TYPE: str = "sha256"
 
 # if 1 all docker items under to the dirname path of the manifest.json get all the properties set.
 DOCKER_RECURSIVE = 1
 
+# repo_db entries kept in memory, the least recently used go to a temporary sqlite file
+REPO_DB_MEMORY_ITEMS = 100_000
+
+# a storage listing is parsed as it arrives, in chunks of this size, see json_stream.py
+LISTING_STREAM_CHUNK_SIZE = 256 * 1024
+
+# the only fields of a repo listing item we use, the rest is dropped to keep the item list small
+LISTING_ITEM_FIELDS = ("uri", "sha1", "sha2", "lastModified", "size")
+
+# parallel downloads of .rl_meta files in the pre-pass of a generic repo
+META_PREPASS_WORKERS = 8
+
+# parallel rpm info requests in the warm-up of a rpm repo
+RPM_WARMUP_WORKERS = 8
+
+# --adaptive-concurrency: AIMD limits on the requests in flight per operation, see adaptive_concurrency.py
+ADAPTIVE_MAX_IN_FLIGHT = 32
+ADAPTIVE_START_IN_FLIGHT = 4
+ADAPTIVE_LATENCY_WINDOW = 200  # the latencies of the most recent requests used for the p95
+ADAPTIVE_LATENCY_TOLERANCE = 2.0  # p95 this many times the best p95 counts as congestion
+ADAPTIVE_DECREASE_COOLDOWN = 5.0  # seconds
+THROTTLE_STATUS_CODES = (429, 503)
+PORTAL_THROTTLE_ATTEMPTS = 5  # with --adaptive-concurrency we retry a throttled portal request ourselves
+PORTAL_THROTTLE_FALLBACK_DELAY = 60  # seconds, if the response has no usable Retry-After
+PORTAL_THROTTLE_MAX_DELAY = 15 * 60  # seconds, a Retry-After date further away is likely clock skew
+
+# the only docker files we inspect, all other files in a docker repo are blobs
+DOCKER_MANIFEST_FILES: List[str] = [
+    "manifest.json",
+    "list.manifest.json",
+]
+
+# the order in which the items of one repo are processed, see scheduler.py
+SCHEDULE_LISTING = "listing"
+SCHEDULE_POLICIES: List[str] = [
+    SCHEDULE_LISTING,
+    "newest-first",
+    "oldest-first",
+    "smallest-first",
+    "largest-first",
+]
+
+# items per aql request when paging through large results
+AQL_PAGE_SIZE = 1000
+
+# aql item fields we need to build a storage list item (uri, size, lastModified, sha1, sha2)
+AQL_ITEM_FIELDS: List[str] = [
+    "repo",
+    "path",
+    "name",
+    "size",
+    "modified",
+    "actual_sha1",
+    "sha256",
+]
+
 CLI_REPORTS_FILE = "reports.zip"
 CLI_REPORTS_FILE_TAIL = f"-{CLI_REPORTS_FILE}"
 
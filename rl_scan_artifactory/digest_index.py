@@ -0,0 +1,62 @@
+# python3 ts=4space
+import logging
+import threading
+from dataclasses import (
+    dataclass,
+)
+from typing import (
+    Dict,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+The same bytes are often present more then once in artifactory:
+in a local repo and in the cache of a remote repo, or as multiple tags of the same docker image.
+
+The DigestIndex remembers, for the duration of one run, the purl and the scan result
+of every digest we processed (the sha256 of the file, or the config digest of a docker image).
+A later artifact with the same digest only gets the RL.* properties set,
+without a download, upload or scan.
+"""
+
+
+@dataclass(slots=True)
+class DigestEntry:
+    purl: str  # project/package@version
+    scan_status: str  # pass/fail
+    report: str | None  # full url to the report
+
+
+class DigestIndex:
+    def __init__(
+        self,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, DigestEntry] = {}
+
+    def get(
+        self,
+        digest: str,
+    ) -> DigestEntry | None:
+        with self._lock:
+            return self._entries.get(digest)
+
+    def add(
+        self,
+        digest: str,
+        entry: DigestEntry,
+    ) -> None:
+        # the first result for a digest wins
+        with self._lock:
+            if digest in self._entries:
+                return
+            self._entries[digest] = entry
+
+        logger.debug("digest: %s -> %s", digest, entry)
+
+    def __len__(
+        self,
+    ) -> int:
+        with self._lock:
+            return len(self._entries)
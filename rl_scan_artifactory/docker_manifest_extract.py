@@ -38,7 +38,8 @@ class DockerManifestExtract:
 
     def __init__(
         self,
-        file_path: str,
+        file_path: str,  # with data: only the name is used
+        data: Dict[str, Any] | None = None,  # the json of the manifest if already fetched into memory
     ) -> None:
         self.mt = None
         self.data: Dict[str, Any] = {}
@@ -52,7 +53,10 @@ class DockerManifestExtract:
         self.annotations: Dict[str, Any] = {}
 
         self.validate_file_name()
-        self.read_file_json()
+        if data is None:
+            self.read_file_json()
+        else:
+            self.data = data
         self.check_schema()
         self.check_mediatype()
         self.get_annotations()
@@ -1,10 +1,15 @@
-from .file_properties_common import FilePropertiesCommon as FilePropertiesCommon
-from .file_properties_default import FilePropertiesDefault as FilePropertiesDefault
-from .file_properties_docker import FilePropertiesDocker as FilePropertiesDocker
-from .file_properties_generic import FilePropertiesGeneric as FilePropertiesGeneric
-from .file_properties_maven import FilePropertiesMaven as FilePropertiesMaven
-from .file_properties_nuget import FilePropertiesNuget as FilePropertiesNuget
-from .file_properties_rpm import FilePropertiesRpm as FilePropertiesRpm
+from typing import TYPE_CHECKING
+
+from ..helpers import lazy_module_getattr
+
+if TYPE_CHECKING:
+    from .file_properties_common import FilePropertiesCommon as FilePropertiesCommon
+    from .file_properties_default import FilePropertiesDefault as FilePropertiesDefault
+    from .file_properties_docker import FilePropertiesDocker as FilePropertiesDocker
+    from .file_properties_generic import FilePropertiesGeneric as FilePropertiesGeneric
+    from .file_properties_maven import FilePropertiesMaven as FilePropertiesMaven
+    from .file_properties_nuget import FilePropertiesNuget as FilePropertiesNuget
+    from .file_properties_rpm import FilePropertiesRpm as FilePropertiesRpm
 
 __all__ = [
     "FilePropertiesCommon",
@@ -15,3 +20,16 @@ __all__ = [
     "FilePropertiesNuget",
     "FilePropertiesRpm",
 ]
+
+__getattr__ = lazy_module_getattr(
+    __name__,
+    {
+        "FilePropertiesCommon": ".file_properties_common",
+        "FilePropertiesDefault": ".file_properties_default",
+        "FilePropertiesDocker": ".file_properties_docker",
+        "FilePropertiesGeneric": ".file_properties_generic",
+        "FilePropertiesMaven": ".file_properties_maven",
+        "FilePropertiesNuget": ".file_properties_nuget",
+        "FilePropertiesRpm": ".file_properties_rpm",
+    },
+)
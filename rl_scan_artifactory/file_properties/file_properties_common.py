@@ -5,11 +5,9 @@ from typing import (
     Any,
 )
 
+from .. import simple_data
 from ..artifactory_api import ArtifactoryApi
 from ..fileinfo import FileInfo
-from ..simple_data import SimpleDataDefault
-from ..simple_data import SimpleDataDocker
-from ..simple_data import SimpleDataMaven
 
 logger = logging.getLogger(__name__)
 
@@ -68,22 +66,20 @@ class FilePropertiesCommon:
 
         self.p_type: str = self.file.repo.package_type.lower()
         self.uri: str = self.file.uri.lower()
+        self.properties_loaded: bool = False
 
     def make_simple_data_interface(
         self,
     ) -> Dict[str, Any]:
         dispatch = {
-            "maven": SimpleDataMaven,
-            "docker": SimpleDataDocker,
+            "maven": "SimpleDataMaven",
+            "docker": "SimpleDataDocker",
         }
         assert self.p_type is not None
 
-        if self.p_type in dispatch:
-            sd = dispatch[self.p_type](file=self.file)
-        else:
-            sd = SimpleDataDefault(file=self.file)
-
-        return sd.make_simple_data()
+        sd = getattr(simple_data, dispatch.get(self.p_type, "SimpleDataDefault"))(file=self.file)
+        simple: Dict[str, Any] = sd.make_simple_data()
+        return simple
 
     def _common_filter_on_item_properties(
         self,
@@ -118,7 +114,38 @@ class FilePropertiesCommon:
         logger.debug("properties are now: %s", str(self.props))
         self.file.properties = self.props
 
-    def skip_non_candidate_file(
+    def _get_properties(
+        self,
+    ) -> None:
+        raise NotImplementedError
+
+    def _skip_non_candidate_file(
         self,
     ) -> bool:
         raise NotImplementedError
+
+    def load_properties(
+        self,
+    ) -> None:
+        """
+        Fetch the properties from artifactory on first use only (modifies self.file.properties),
+        so files we skip on the uri alone cost no requests.
+        """
+        if self.properties_loaded:
+            return
+
+        self.properties_loaded = True
+        self._get_properties()
+
+    def reload_properties(
+        self,
+    ) -> None:
+        """fetch the properties again, e.g. a other process may have changed them"""
+        self.properties_loaded = False
+        self.load_properties()
+
+    def skip_non_candidate_file(
+        self,
+    ) -> bool:
+        self.load_properties()
+        return self._skip_non_candidate_file()
@@ -65,14 +65,12 @@ class FilePropertiesDefault(
             artifactory_api=artifactory_api,
         )
 
-        self._get_properties()  # modifies self.file.properties
-
     def _get_properties(
         self,
     ) -> None:
         self._get_common_properties()
 
-    def skip_non_candidate_file(
+    def _skip_non_candidate_file(
         self,
     ) -> bool:
         return self._common_filter_on_item_properties()
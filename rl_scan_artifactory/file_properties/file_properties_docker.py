@@ -69,8 +69,6 @@ class FilePropertiesDocker(
             artifactory_api=artifactory_api,
         )
 
-        self._get_properties()  # modifies self.file.properties
-
     def _get_properties(
         self,
     ) -> None:
@@ -111,7 +109,7 @@ class FilePropertiesDocker(
         logger.debug("properties are now: %s", str(self.props))
         self.file.properties = self.props
 
-    def skip_non_candidate_file(
+    def _skip_non_candidate_file(
         self,
     ) -> bool:
         if not self.uri.endswith(self.k):
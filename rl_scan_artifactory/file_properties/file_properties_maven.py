@@ -65,8 +65,6 @@ class FilePropertiesMaven(
             artifactory_api=artifactory_api,
         )
 
-        self._get_properties()  # modifies self.file.properties
-
     def _get_properties(
         self,
     ) -> None:
@@ -107,7 +105,7 @@ class FilePropertiesMaven(
         logger.debug("properties are now: %s", str(self.props))
         self.file.properties = self.props
 
-    def skip_non_candidate_file(
+    def _skip_non_candidate_file(
         self,
     ) -> bool:
         k = "jar"
@@ -66,14 +66,12 @@ class FilePropertiesNuget(
             artifactory_api=artifactory_api,
         )
 
-        self._get_properties()  # modifies self.file.properties
-
     def _get_properties(
         self,
     ) -> None:
         self._get_common_properties()
 
-    def skip_non_candidate_file(
+    def _skip_non_candidate_file(
         self,
     ) -> bool:
         k = "nupkg"
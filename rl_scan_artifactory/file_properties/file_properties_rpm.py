@@ -66,8 +66,6 @@ class FilePropertiesRpm(
             artifactory_api=artifactory_api,
         )
 
-        self._get_properties()  # modifies self.file.properties
-
     def _get_properties(
         self,
     ) -> None:
@@ -95,7 +93,7 @@ class FilePropertiesRpm(
         logger.debug("after touch rpm info; properties are now: %s", str(self.props))
         self.file.properties = self.props
 
-    def skip_non_candidate_file(
+    def _skip_non_candidate_file(
         self,
     ) -> bool:
         return self._common_filter_on_item_properties()
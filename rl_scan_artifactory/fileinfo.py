@@ -14,7 +14,7 @@ from .artifactory_repo_info import ArtifactoryRepoInfo
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class FileInfo:
     uri: str
     sha1: str
@@ -13,7 +13,7 @@ from typing import (
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class GenericMeta:
     name: str
     version: str
@@ -1,7 +1,19 @@
-from typing import Dict
+import importlib
+from typing import (
+    Any,
+    Callable,
+    Dict,
+)
 
 from .exceptions import SpectraAssureInvalidAction
 
+_SIZE_UNITS: Dict[str, int] = {
+    "K": 1024,
+    "M": 1024**2,
+    "G": 1024**3,
+    "T": 1024**4,
+}
+
 
 def set_proxy(
     *,
@@ -29,3 +41,47 @@ def set_proxy(
         "http": f"http://{user}:{password}@{server}:{port}",
         "https": f"http://{user}:{password}@{server}:{port}",
     }
+
+
+def lazy_module_getattr(
+    package: str,
+    exports: Dict[str, str],
+) -> Callable[[str], Any]:
+    """Make a module level __getattr__ that imports exported names on first use.
+
+    exports maps the public name to the (relative) module that defines it,
+    so a package only pays for the submodules that are actually used.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+
+        module = importlib.import_module(exports[name], package=package)
+        return getattr(module, name)
+
+    return __getattr__
+
+
+def parse_size(
+    size: str | None,
+    what: str = "size",  # for the error message, e.g. the option name
+) -> int:
+    """'500M', '2G', '1024' -> bytes; 0 if not set"""
+    if size is None or size.strip() == "":
+        return 0
+
+    s = size.strip().upper()
+    if s.endswith("B"):
+        s = s[:-1]
+
+    factor = 1
+    if s and s[-1] in _SIZE_UNITS:
+        factor = _SIZE_UNITS[s[-1]]
+        s = s[:-1]
+
+    try:
+        return int(float(s) * factor)
+    except ValueError as e:
+        msg = f"invalid {what}: {size}; use e.g. 500M or 20G"
+        raise SpectraAssureInvalidAction(message=msg) from e
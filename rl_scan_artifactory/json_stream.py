@@ -0,0 +1,132 @@
+# python3 ts=4space
+import codecs
+import json
+import logging
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+Parse a large json object as it arrives and yield the items of one top level array,
+e.g. the 'files' of a deep storage listing, without holding the whole response or all items in memory.
+
+No extra dependency (like ijson): the items are small, each is decoded with json.JSONDecoder.raw_decode
+once the buffer holds all of it; the consumed text is dropped from the buffer.
+Invalid json raises a ValueError (json.JSONDecodeError).
+"""
+
+_WHITESPACE = " \t\r\n"
+_END_OF_VALUE = _WHITESPACE + ",]}:"
+
+
+class _StreamBuffer:
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+    ) -> None:
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(
+        self,
+    ) -> bool:
+        """append the next chunk; False at the end of the stream"""
+        if self.eof:
+            return False
+
+        # we only need more when the rest of the buffer is a incomplete value, keep only that
+        self.buf = self.buf[self.pos :]
+        self.pos = 0
+
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.buf += self._text_decoder.decode(b"", final=True)
+            self.eof = True
+            return False
+
+        self.buf += self._text_decoder.decode(chunk)
+        return True
+
+    def peek(
+        self,
+    ) -> str | None:
+        """skip whitespace, return the next character without consuming it; None at the end"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return None
+
+    def expect(
+        self,
+        char: str,
+    ) -> None:
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"expected {char!r}, found {found!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(
+        self,
+    ) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+
+            # a number like '1' may continue as '1.25' in the next chunk, only a delimiter ends it for sure
+            if (end < len(self.buf) and self.buf[end] in _END_OF_VALUE) or not self.more():
+                self.pos = end
+                return value
+
+
+def iter_json_array(
+    chunks: Iterable[bytes],
+    key: str,
+) -> Iterator[Any]:
+    """yield the items of the array 'key' of the top level json object in chunks"""
+    b = _StreamBuffer(chunks)
+
+    b.expect("{")
+    if b.peek() == "}":
+        return
+
+    while True:
+        name = b.value()
+        b.expect(":")
+
+        if name == key:
+            b.expect("[")
+            if b.peek() == "]":
+                b.pos += 1
+            else:
+                while True:
+                    yield b.value()
+                    if b.peek() == ",":
+                        b.pos += 1
+                        continue
+                    b.expect("]")
+                    break
+        else:
+            b.value()  # small values like 'uri' and 'created'
+
+        if b.peek() == ",":
+            b.pos += 1
+            continue
+        b.expect("}")
+        return
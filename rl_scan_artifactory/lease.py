@@ -0,0 +1,146 @@
+# python3 ts=4space
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Iterator,
+)
+
+from .artifactory_api import ArtifactoryApi
+from .artifactory_repo_info import ArtifactoryRepoInfo
+from .constants import (
+    LEASE_TTL,
+    LEASE_VERIFY_WAIT,
+    PROP_NAME_SPECTRA_ASSURE_LEASE,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+With --lease any number of processes can work on the same repo.
+
+Before a item is processed we claim it with the property RL.lease = <owner>:<expiry epoch seconds>,
+only if it has real work: items that are not a candidate or already scanned are skipped without a lease.
+A item with a lease of a other owner that has not expired is skipped,
+a expired lease (the owner crashed) is taken over.
+Artifactory has no compare-and-set on properties, so after the claim we read the lease back after a short wait:
+if a other process claimed it at the same moment only the last writer continues.
+While we process the item the expiry is renewed every ttl/3, so a long scan keeps its lease;
+the ttl only needs to cover a crashed process (no renewal) and a renewal that was delayed.
+When the item is done the lease is removed.
+"""
+
+
+def default_lease_owner() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Lease:
+    def __init__(
+        self,
+        *,
+        artifactory_api: ArtifactoryApi,
+        owner: str | None = None,
+        ttl: int = LEASE_TTL,  # seconds, renewed every ttl/3 while we process the item
+    ) -> None:
+        self.artifactory_api = artifactory_api
+        self.owner = (owner or default_lease_owner()).replace(":", "_")
+        self.ttl = ttl
+
+    def _read(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item_uri: str,
+    ) -> tuple[str, float] | None:
+        props = self.artifactory_api.get_one_prop(
+            repo=repo,
+            item_uri=item_uri,
+            key=PROP_NAME_SPECTRA_ASSURE_LEASE,
+        )
+        values = (props or {}).get(PROP_NAME_SPECTRA_ASSURE_LEASE, [])
+        if len(values) == 0:
+            return None
+
+        owner, _, expiry = str(values[0]).rpartition(":")
+        try:
+            return owner, float(expiry)
+        except ValueError:
+            logger.warning("ignore invalid lease on %s:%s: %s", repo.name, item_uri, values[0])
+            return None
+
+    def _write(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item_uri: str,
+    ) -> bool:
+        ok = self.artifactory_api.put_one_prop(
+            repo=repo,
+            item_uri=item_uri,
+            key=PROP_NAME_SPECTRA_ASSURE_LEASE,
+            value=f"{self.owner}:{int(time.time() + self.ttl)}",
+        )
+        if ok is False:
+            logger.error("cannot set the lease on: %s:%s", repo.name, item_uri)
+            return False
+        return True
+
+    def claim(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item_uri: str,
+    ) -> bool:
+        """True if we may process the item"""
+        now = time.time()
+
+        current = self._read(repo, item_uri)
+        if current is not None:
+            owner, expiry = current
+            if owner != self.owner and expiry > now:
+                logger.info("leased by %s: %s:%s", owner, repo.name, item_uri)
+                return False
+            if owner != self.owner:
+                logger.info("take over expired lease of %s: %s:%s", owner, repo.name, item_uri)
+
+        if self._write(repo, item_uri) is False:
+            return False
+
+        time.sleep(LEASE_VERIFY_WAIT)
+        current = self._read(repo, item_uri)
+        return current is not None and current[0] == self.owner
+
+    def release(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item_uri: str,
+    ) -> None:
+        self.artifactory_api.del_one_prop(
+            repo=repo,
+            item_uri=item_uri,
+            key=PROP_NAME_SPECTRA_ASSURE_LEASE,
+        )
+
+    @contextmanager
+    def held(
+        self,
+        repo: ArtifactoryRepoInfo,
+        item_uri: str,
+    ) -> Iterator[None]:
+        """after a successful claim: renew the lease while the caller processes the item, release it at the end"""
+        stop = threading.Event()
+
+        def renew() -> None:
+            while not stop.wait(self.ttl / 3):
+                logger.debug("renew lease: %s:%s", repo.name, item_uri)
+                self._write(repo, item_uri)
+
+        renewer = threading.Thread(target=renew, name=f"lease-{item_uri}", daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            renewer.join()
+            self.release(repo, item_uri)
@@ -2,10 +2,7 @@
 
 import logging
 
-from rl_scan_artifactory import (
-    MyArgs,
-    MyApp,
-)
+from rl_scan_artifactory import MyArgs
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +13,10 @@ def main() -> None:
         logging.getLogger(name).setLevel(logging.CRITICAL)
         logging.getLogger(name).propagate = False
 
-    args = MyArgs()
+    args = MyArgs()  # exits early on --version, before any backend code is loaded
+
+    from rl_scan_artifactory import MyApp
+
     ma = MyApp(args=args)
     ma.run_all()
 
@@ -0,0 +1,81 @@
+# python3 ts=4space
+import json
+import logging
+import os
+import threading
+from typing import (
+    Any,
+    Dict,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+The parsed content of .rl_meta files, keyed by the repo name and the sha1 of the meta file.
+
+A meta file with the same sha1 has the same content, so we never have to download it again
+(the repo is part of the key as the purl project is derived from the repo name).
+With a --state-dir the cache is saved at the end of the pre-pass and loaded on the next run.
+"""
+
+META_CACHE_FILE = "rl_meta_cache.json"
+
+
+class MetaCache:
+    def __init__(
+        self,
+        state_dir: str | None = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+        self.path: str | None = None
+        if state_dir is not None:
+            self.path = os.path.join(state_dir, META_CACHE_FILE)
+            self._load()
+
+    def _load(
+        self,
+    ) -> None:
+        assert self.path is not None
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            logger.exception("ignore unreadable meta cache: %s; %s", self.path, e)
+            self._entries = {}
+
+        logger.debug("loaded %d meta entries from: %s", len(self._entries), self.path)
+
+    def get(
+        self,
+        sha1: str,
+    ) -> Dict[str, Any] | None:
+        with self._lock:
+            return self._entries.get(sha1)
+
+    def put(
+        self,
+        sha1: str,
+        meta_info: Dict[str, Any],
+    ) -> None:
+        with self._lock:
+            self._entries[sha1] = meta_info
+            self._dirty = True
+
+    def save(
+        self,
+    ) -> None:
+        if self.path is None or self._dirty is False:
+            return
+
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
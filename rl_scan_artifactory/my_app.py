@@ -1,8 +1,11 @@
 # python3 ts=4space
+import json
 import logging
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import (
     Any,
@@ -10,33 +13,43 @@ from typing import (
     Dict,
 )
 
+from . import (
+    artifactory_file_processor,
+    file_properties,
+)
 from .app_base_with_logging import AppBaseWithLogging
 from .artifactory_api import ArtifactoryApi
-from .artifactory_file_processor import (
-    ArtifactoryFileProcessorCommon,
-    ArtifactoryFileProcessorDefault,
-    ArtifactoryFileProcessorDocker,
-    ArtifactoryFileProcessorGeneric,  # artifactory generic package_type
-)
+from .artifactory_file_processor import ArtifactoryFileProcessorCommon
 from .artifactory_repo_info import ArtifactoryRepoInfo
 from .artifactory_repo_processor import ArtifactoryRepoProcessor
+from .blob_cache import BlobCache
 from .constants import (
     PROCESS_FILE_SKIP,
-    CLI_REPORTS_FILE_TAIL,
+    META_PREPASS_WORKERS,
     META_STRING,
+    REPO_DB_MEMORY_ITEMS,
+    LEASE_TTL,
+    RPM_WARMUP_WORKERS,
 )
-from .file_properties import (
-    FilePropertiesDefault,
-    FilePropertiesDocker,
-    FilePropertiesMaven,
-    FilePropertiesNuget,
-    FilePropertiesRpm,
-    FilePropertiesGeneric,
+from .digest_index import DigestIndex
+from .helpers import (
+    parse_size,
+    set_proxy,
 )
-from .helpers import set_proxy
+from .lease import Lease
+from .meta_cache import MetaCache
 from .my_args import MyArgs
+from .repo_db import RepoDb
+from .scheduler import (
+    parse_shard,
+    shard_items,
+)
 from .spectra_assure_api import SpectraAssureApi
 from .version import VERSION
+from .watermark import (
+    Watermarks,
+    cap_watermark,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +74,36 @@ class MyApp(
         self.WITH_TEST_LIMIT_REPO_TO = int(os.getenv("WITH_TEST_LIMIT_REPO_TO", 0))
         self.not_finished: List[ArtifactoryFileProcessorCommon] = []
 
+        # --byte-budget: stop starting new work once we processed this many bytes (0: no limit)
+        self.byte_budget: int = parse_size(self.cli_args.get("byte_budget"), what="byte budget")
+        self.shard = parse_shard(self.cli_args.get("shard"))
+        self.bytes_processed: int = 0
+        self.bytes_lock = threading.Lock()
+
+        self.pending_repo_dbs: List[RepoDb] = []
+
+        # the same for every artifact, create once and share
+        self.portal_info = ArtifactoryFileProcessorCommon.make_portal_info(self.cli_args)
+        self.proxy_info = ArtifactoryFileProcessorCommon.make_proxy_info(self.cli_args)
+
+        self.meta_cache = MetaCache(state_dir=self.cli_args.get("state_dir"))
+
+        self.lease: Lease | None = None
+        if self.cli_args.get("lease") is True:
+            self.lease = Lease(
+                artifactory_api=self.artifactory_api,
+                owner=self.cli_args.get("lease_owner"),
+                ttl=int(self.cli_args.get("lease_ttl") or LEASE_TTL),
+            )
+
+        self.watermarks: Watermarks | None = None
+        if self.cli_args.get("watermark") is True:
+            self.watermarks = Watermarks(state_dir=self.cli_args["state_dir"])
+
+        self.digest_index: DigestIndex | None = None
+        if self.cli_args.get("dedupe_by_digest") is True:
+            self.digest_index = DigestIndex()
+
         self.proxies: Dict[str, str] = set_proxy(
             server=self.cli_args.get("proxy_server"),
             port=self.cli_args.get("proxy_port"),
@@ -68,6 +111,15 @@ class MyApp(
             password=self.cli_args.get("proxy_password"),
         )
 
+    def _prepass_workers(
+        self,
+        workers: int,
+    ) -> int:
+        """with --adaptive-concurrency the pool may be as large as the max in flight, the controller limits it"""
+        if len(self.artifactory_api.concurrency.limits) == 0:
+            return workers
+        return max(workers, int(self.cli_args.get("adaptive_max_in_flight") or workers))
+
     def my_print(self, msg: str) -> None:
         logger.info(msg)
         print(msg)
@@ -89,25 +141,20 @@ class MyApp(
         p_type: str,
         afp: ArtifactoryFileProcessorCommon,
     ) -> Any:
+        # class names only, the module is imported on first use
         dispatch = {
-            "docker": FilePropertiesDocker,
-            "nuget": FilePropertiesNuget,
-            "rpm": FilePropertiesRpm,
-            "maven": FilePropertiesMaven,
-            "generic": FilePropertiesGeneric,
+            "docker": "FilePropertiesDocker",
+            "nuget": "FilePropertiesNuget",
+            "rpm": "FilePropertiesRpm",
+            "maven": "FilePropertiesMaven",
+            "generic": "FilePropertiesGeneric",
         }
-        if p_type in dispatch:
-            fp = dispatch[p_type](
-                cli_args=self.cli_args,
-                file=afp.get_file(),
-                artifactory_api=self.artifactory_api,
-            )
-        else:
-            fp = FilePropertiesDefault(
-                cli_args=self.cli_args,
-                file=afp.get_file(),
-                artifactory_api=self.artifactory_api,
-            )
+        fp_class = getattr(file_properties, dispatch.get(p_type, "FilePropertiesDefault"))
+        fp = fp_class(
+            cli_args=self.cli_args,
+            file=afp.get_file(),
+            artifactory_api=self.artifactory_api,
+        )
 
         afp.set_file_properties(fp=fp)
 
@@ -116,31 +163,23 @@ class MyApp(
         repo: ArtifactoryRepoInfo,
         p_type: str,
         artifact_item: Dict[str, Any],
-        repo_db: Dict[str, Any],
+        repo_db: RepoDb,
     ) -> ArtifactoryFileProcessorCommon:
         dispatch = {
-            "docker": ArtifactoryFileProcessorDocker,
-            "generic": ArtifactoryFileProcessorGeneric,
+            "docker": "ArtifactoryFileProcessorDocker",
+            "generic": "ArtifactoryFileProcessorGeneric",  # artifactory generic package_type
         }
-
-        if p_type in dispatch:
-            afp = dispatch[p_type](
-                cli_args=self.cli_args,
-                spectra_assure_api=self.spectra_assure_api,
-                artifactory_api=self.artifactory_api,
-                repo=repo,
-                artifact_item=artifact_item,
-                repo_db=repo_db,
-            )
-        else:
-            afp = ArtifactoryFileProcessorDefault(
-                cli_args=self.cli_args,
-                spectra_assure_api=self.spectra_assure_api,
-                artifactory_api=self.artifactory_api,
-                repo=repo,
-                artifact_item=artifact_item,
-                repo_db=repo_db,
-            )
+        afp_class = getattr(artifactory_file_processor, dispatch.get(p_type, "ArtifactoryFileProcessorDefault"))
+        afp: ArtifactoryFileProcessorCommon = afp_class(
+            cli_args=self.cli_args,
+            spectra_assure_api=self.spectra_assure_api,
+            artifactory_api=self.artifactory_api,
+            repo=repo,
+            artifact_item=artifact_item,
+            repo_db=repo_db,
+            portal_info=self.portal_info,
+            proxy_info=self.proxy_info,
+        )
 
         self._add_fp(
             p_type=p_type,
@@ -195,7 +234,9 @@ class MyApp(
         repo: ArtifactoryRepoInfo,
         p_type: str,
         artifact_item: Dict[str, Any],
-        repo_db: Dict[str, Any],
+        repo_db: RepoDb,
+        blob_cache: BlobCache | None = None,
+        unfinished: List[Dict[str, Any]] | None = None,
     ) -> str:
         """
         inspect one artifact file
@@ -207,17 +248,12 @@ class MyApp(
         - repo_db:  a place we can collect data that may be usefull for other artifacts
             e.g. docker images consist of multiple files in a tree
             we can also use it to collect meta files for p_type: `generic`
+        - blob_cache: shared downloads for the platform images of one docker image index.
+        - unfinished: collects the items with work that did not reach a final state, for the watermark.
         """
 
         start: float = time.time()
 
-        afp = self._get_my_afp(  # ArtifactoryFileProcessor
-            p_type=p_type,
-            repo=repo,
-            artifact_item=artifact_item,
-            repo_db=repo_db,
-        )
-
         uri = artifact_item.get("uri", "")
         portal_mode = self.cli_args.get("portal") is True
         uri_l = uri.lower()
@@ -227,17 +263,56 @@ class MyApp(
             logger.debug("skip meta %s", uri_l)
             return PROCESS_FILE_SKIP
 
-        if uri_l.endswith(CLI_REPORTS_FILE_TAIL):
-            logger.debug("skip report file %s", uri_l)
-            return PROCESS_FILE_SKIP
+        # the file properties are only fetched when the processor first needs them
+        afp = self._get_my_afp(  # ArtifactoryFileProcessor
+            p_type=p_type,
+            repo=repo,
+            artifact_item=artifact_item,
+            repo_db=repo_db,
+        )
+        if blob_cache is not None:
+            afp.set_blob_cache(blob_cache)
+        if self.digest_index is not None:
+            afp.set_digest_index(self.digest_index)
 
         msg = f"Inspecting {repo.name}:{uri}"
         self.my_print(msg)
 
+        # the properties we read here are reused by process(), only items with real work need a lease
+        has_work = afp.has_work()
+        if self.lease is None or has_work is False:
+            status = self._process_one_afp(afp=afp, start=start)
+        elif not self.lease.claim(repo, uri):
+            status = PROCESS_FILE_SKIP  # an other process works on it
+        else:
+            with self.lease.held(repo, uri):
+                assert afp.fp is not None
+                afp.fp.reload_properties()  # a other process may have finished it just before our claim
+                has_work = afp.has_work()
+                status = self._process_one_afp(afp=afp, start=start)
+
+        # a item with work that ends as skip failed or was leased by a other process
+        if has_work and status in [PROCESS_FILE_SKIP] and unfinished is not None:
+            unfinished.append(artifact_item)
+
+        return status
+
+    def _process_one_afp(
+        self,
+        afp: ArtifactoryFileProcessorCommon,
+        start: float,
+    ) -> str:
+        portal_mode = self.cli_args.get("portal") is True
+
         completed = afp.process()
         if completed is False:
             if portal_mode:
                 self.not_finished.append(afp)  # save for later inspection
+        afp.record_digest()
+
+        if afp.get_process_status() not in [PROCESS_FILE_SKIP]:
+            with self.bytes_lock:
+                self.bytes_processed += afp.processed_bytes
 
         self._print_info_report(
             afp=afp,
@@ -279,34 +354,26 @@ class MyApp(
                         return True
         return False
 
-    def _is_cli_and_uri_ends_with_reports_tail(
-        self,
-        uri: str,
-    ) -> bool:
-        if self.cli_args.get("cli") is True:
-            if uri.lower().endswith(CLI_REPORTS_FILE_TAIL):
-                return True
-
-        if uri.lower().endswith(CLI_REPORTS_FILE_TAIL):
-            # during internal testing we mix portal and cli in the same artifactory instance
-            # so skip the report tails always
-            return True
-
-        return False
-
     def _repo_generic_extract_rl_meta_info(
         self,
         arp: ArtifactoryRepoProcessor,
-        repo_db: Dict[str, Any],
+        artifact_items: List[Dict[str, Any]],
+        repo_db: RepoDb,
     ) -> None:
-        """Find all files ending in .rl_meta and extract the meta info"""
+        """
+        Find all files ending in .rl_meta and extract the meta info.
+        Meta files are downloaded concurrently, a meta file we parsed before (same sha1) is not downloaded again.
+        """
         repo = arp.get_repo()
         p_type = arp.p_type
 
-        for artifact_item in arp.process():
-            uri = artifact_item.get("uri", "")
-            if not uri.lower().endswith(META_STRING):
-                continue
+        meta_items = [item for item in artifact_items if item.get("uri", "").lower().endswith(META_STRING)]
+
+        def extract_one(artifact_item: Dict[str, Any]) -> Dict[str, Any]:
+            key = f"{repo.name}/{artifact_item.get('sha1')}"
+            zz = self.meta_cache.get(key)
+            if zz is not None:
+                return zz
 
             afp = self._get_my_afp(  # ArtifactoryFileProcessor
                 p_type=p_type,
@@ -316,6 +383,17 @@ class MyApp(
             )
 
             zz = afp.extract_generic_meta_info()
+            if zz.get("meta") is not None:
+                self.meta_cache.put(key, zz)
+            return zz
+
+        with ThreadPoolExecutor(max_workers=self._prepass_workers(META_PREPASS_WORKERS)) as executor:
+            results = list(executor.map(extract_one, meta_items))
+
+        self.meta_cache.save()
+
+        for artifact_item, zz in zip(meta_items, results):
+            uri = artifact_item.get("uri", "")
             meta = zz.get("meta")
 
             msg = f"Uri: {uri} -> {zz}"
@@ -331,6 +409,79 @@ class MyApp(
             logger.debug(msg)
             logger.debug("%s %s", uri, zz)
 
+    def _repo_docker_extract_image_indexes(
+        self,
+        arp: ArtifactoryRepoProcessor,
+        artifact_items: List[Dict[str, Any]],
+        repo_db: RepoDb,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Find all list.manifest.json files and collect the platform images of each index"""
+        repo = arp.get_repo()
+        p_type = arp.p_type
+
+        items_by_uri = {item.get("uri", ""): item for item in artifact_items}
+
+        image_indexes: Dict[str, List[Dict[str, Any]]] = {}
+        for artifact_item in artifact_items:
+            uri = artifact_item.get("uri", "")
+            if uri.split("/")[-1].lower() != "list.manifest.json":
+                continue
+
+            afp = self._get_my_afp(  # ArtifactoryFileProcessor
+                p_type=p_type,
+                repo=repo,
+                artifact_item=artifact_item,
+                repo_db=repo_db,
+            )
+            platform_uris = afp.extract_docker_image_index()
+            afp.remove_my_files()
+
+            # a remote cache only has the platform images that were actually pulled
+            image_indexes[uri] = [items_by_uri[k] for k in platform_uris if k in items_by_uri]
+            logger.debug("Uri: %s -> %s", uri, platform_uris)
+
+        return image_indexes
+
+    def _run_one_docker_image_index(
+        self,
+        repo: ArtifactoryRepoInfo,
+        p_type: str,
+        platform_items: List[Dict[str, Any]],
+        repo_db: RepoDb,
+        unfinished: List[Dict[str, Any]] | None = None,
+    ) -> List[str]:
+        """
+        Process all platform images of one docker image index as one unit of work:
+        the platform images are processed concurrently and blobs shared between them are downloaded once.
+        """
+        workers = max(1, int(self.cli_args.get("docker_platform_workers") or 1))
+        blob_cache = BlobCache()
+
+        def run_one_platform(artifact_item: Dict[str, Any]) -> str:
+            return self._run_one_repo_one_artifact(
+                repo=repo,
+                p_type=p_type,
+                artifact_item=artifact_item,
+                repo_db=repo_db,
+                blob_cache=blob_cache,
+                unfinished=unfinished,
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(run_one_platform, platform_items))
+        finally:
+            blob_cache.cleanup()
+
+    def _byte_budget_exhausted(
+        self,
+    ) -> bool:
+        if self.byte_budget <= 0:
+            return False
+
+        with self.bytes_lock:
+            return self.bytes_processed >= self.byte_budget
+
     def _run_one_repo_all_artifacts(  # noqa: C901
         self,
         repo_name: str,
@@ -373,29 +524,100 @@ class MyApp(
         # ----------------------------------------
         # the repo_db can collect info on items we need later: docker json files
         # we can also collect meta files for cli and generic
-        repo_db: Dict[str, Any] = {}
+        repo_db = RepoDb(
+            memory_items=int(self.cli_args.get("repo_db_memory_items") or REPO_DB_MEMORY_ITEMS),
+            spill_dir=self.cli_args.get("download"),
+        )
+        unfinished: List[Dict[str, Any]] = []
+        try:
+            completed = self._run_one_repo_items(
+                arp=arp,
+                repo=repo,
+                p_type=p_type,
+                repo_db=repo_db,
+                unfinished=unfinished,
+            )
 
-        # lets extract all meta files we can find
+            # only move the watermark if we did not stop early, otherwise we would miss items next time
+            if completed and self.watermarks is not None and arp.newest_modified is not None:
+                since = self.watermarks.get(repo.name)
+                watermark = cap_watermark(arp.newest_modified, unfinished, since)
+                if len(unfinished) > 0:
+                    logger.info("%s: %d unfinished items, watermark: %s", repo.name, len(unfinished), watermark)
+                if watermark is not None:
+                    self.watermarks.set(repo.name, watermark)
+                    self.watermarks.save()
+        finally:
+            # pending items still need their meta info, those close after _finish_any_pending()
+            if any(afp.repo_db is repo_db for afp in self.not_finished):
+                self.pending_repo_dbs.append(repo_db)
+            else:
+                repo_db.close()
+
+    def _run_one_repo_items(
+        self,
+        arp: ArtifactoryRepoProcessor,
+        repo: ArtifactoryRepoInfo,
+        p_type: str,
+        repo_db: RepoDb,
+        unfinished: List[Dict[str, Any]],
+    ) -> bool:
+        """process all listed items of the repo, returns False if we stopped early"""
+        since = None
+        if self.watermarks is not None:
+            since = self.watermarks.get(repo.name)
+        artifact_items = arp.process(since=since)
+
+        # lets extract all meta files we can find, a file of this shard may have its meta file in a other shard
         if p_type == "generic":
-            self._repo_generic_extract_rl_meta_info(arp, repo_db)
+            self._repo_generic_extract_rl_meta_info(arp, artifact_items, repo_db)
+
+        artifact_items = shard_items(artifact_items, repo.name, p_type, self.shard)
+
+        # let artifactory populate the rpm metadata properties before we need them
+        if p_type == "rpm":
+            arp.warm_up_rpm_metadata(artifact_items, workers=self._prepass_workers(RPM_WARMUP_WORKERS))
+
+        # multi platform docker images are processed per index, not per platform manifest.json
+        image_indexes: Dict[str, List[Dict[str, Any]]] = {}
+        if p_type == "docker":
+            image_indexes = self._repo_docker_extract_image_indexes(arp, artifact_items, repo_db)
+
+        in_image_index = {item.get("uri", "") for items in image_indexes.values() for item in items}
 
         n = 0
-        for artifact_item in arp.process():
+        for artifact_item in artifact_items:
+            if self._byte_budget_exhausted():
+                msg = f"byte budget reached: {self.bytes_processed} >= {self.byte_budget}; stop processing"
+                self.my_print(msg)
+                return False
+
             uri = artifact_item.get("uri", "")
-            if self._is_cli_and_uri_ends_with_reports_tail(uri=uri):
-                continue
+            if uri in in_image_index:
+                continue  # done together with its list.manifest.json
 
             logger.debug("%s", uri)
 
-            reason = self._run_one_repo_one_artifact(
-                repo=repo,
-                p_type=p_type,
-                artifact_item=artifact_item,
-                repo_db=repo_db,
-            )
-
-            if reason not in [PROCESS_FILE_SKIP]:
-                n += 1
+            if uri in image_indexes:
+                reasons = self._run_one_docker_image_index(
+                    repo=repo,
+                    p_type=p_type,
+                    platform_items=image_indexes[uri],
+                    repo_db=repo_db,
+                    unfinished=unfinished,
+                )
+            else:
+                reasons = [
+                    self._run_one_repo_one_artifact(
+                        repo=repo,
+                        p_type=p_type,
+                        artifact_item=artifact_item,
+                        repo_db=repo_db,
+                        unfinished=unfinished,
+                    )
+                ]
+
+            n += len([reason for reason in reasons if reason not in [PROCESS_FILE_SKIP]])
 
             if self.WITH_TEST_LIMIT_REPO_TO == 0:
                 continue
@@ -407,7 +629,9 @@ class MyApp(
                 "limit reached: WITH_TEST_LIMIT_REPO_TO: %d",
                 self.WITH_TEST_LIMIT_REPO_TO,
             )
-            break
+            return False
+
+        return True
 
     def _finish_any_pending(
         self,
@@ -421,6 +645,7 @@ class MyApp(
 
             start: float = time.time()
             afp.process()
+            afp.record_digest()
             afp.remove_my_files()
 
             self._print_info_report(
@@ -428,6 +653,22 @@ class MyApp(
                 start=start,
             )
 
+    def _print_run_metrics(
+        self,
+    ) -> None:
+        metrics: Dict[str, Any] = {
+            "bytes_processed": self.bytes_processed,
+        }
+        if self.artifactory_api.concurrency.limits:
+            metrics["artifactory_concurrency"] = self.artifactory_api.concurrency.snapshot()
+        if self.spectra_assure_api is not None and self.spectra_assure_api.concurrency.limits:
+            metrics["portal_concurrency"] = self.spectra_assure_api.concurrency.snapshot()
+
+        msg = f"run metrics: {json.dumps(metrics)}"
+        logger.info(msg)
+        if self.verbose:
+            print(msg)
+
     def _if_print_version_and_exit(self) -> None:
         if self.cli_args.get("version", "") is True:
             msg = f"version: {VERSION}"
@@ -466,7 +707,16 @@ class MyApp(
 
         repo_names = self.cli_args.get("repo", [])
         for repo_name in repo_names:
+            if self._byte_budget_exhausted():
+                logger.info("byte budget reached, skip repo: %s", repo_name)
+                continue
             self._run_one_repo_all_artifacts(repo_name)
 
         if self.cli_args.get("portal") is True:
             self._finish_any_pending()
+
+        for repo_db in self.pending_repo_dbs:
+            repo_db.close()
+        self.pending_repo_dbs = []
+
+        self._print_run_metrics()
@@ -4,6 +4,7 @@ import logging
 import os
 import sys
 from typing import (
+    Callable,
     Dict,
     List,
     Any,
@@ -13,6 +14,11 @@ from .constants import (
     MY_ENV_NAMES,
     DEFAULT_TEMPDIR,
     CliReportFormatList,
+    SCHEDULE_LISTING,
+    SCHEDULE_POLICIES,
+    REPO_DB_MEMORY_ITEMS,
+    LEASE_TTL,
+    ADAPTIVE_MAX_IN_FLIGHT,
 )
 from .exceptions import SpectraAssureInvalidAction
 from .version import VERSION
@@ -25,6 +31,7 @@ class MyArgs:  # pylint: disable=R0903; Too few public methods
         self,
         repo_list_may_be_empty: bool = False,
         no_portal_or_cli: bool = False,
+        add_extra_args: Callable[[argparse.ArgumentParser], None] | None = None,  # options of a tool script
     ) -> None:
         self.repo_list_may_be_empty = repo_list_may_be_empty
         self.prog = self._get_prog_name()
@@ -34,6 +41,8 @@ class MyArgs:  # pylint: disable=R0903; Too few public methods
             epilog="",
         )
         self._setup_cli_args()
+        if add_extra_args is not None:
+            add_extra_args(self.parser)
         self._do_env_args()
 
         self.cli_args = self._finalize_args()
@@ -245,6 +254,15 @@ class MyArgs:  # pylint: disable=R0903; Too few public methods
             help="Create a reports.rl-safe archive and add it to the reports.",
         )
 
+        self.parser.add_argument(
+            "--cli-reports-compress-level",
+            type=int,
+            choices=range(0, 10),
+            default=None,
+            metavar="{0-9}",
+            help="Deflate the reports bundle with this compression level; default: store without compression.",
+        )
+
         self.parser.add_argument(
             "-r",
             "--repo",
@@ -254,6 +272,20 @@ class MyArgs:  # pylint: disable=R0903; Too few public methods
             # allow for comma separated items 2025-01-16
         )
 
+        self.parser.add_argument(
+            "--include",
+            action="append",
+            default=[],
+            help="Only process files whose path in the repo matches this glob, e.g. '*.jar'; may be repeated.",
+        )
+
+        self.parser.add_argument(
+            "--exclude",
+            action="append",
+            default=[],
+            help="Do not process files whose path in the repo matches this glob, e.g. 'snapshots/*'; may be repeated.",
+        )
+
         self.parser.add_argument(
             "-d",
             "--download",
@@ -276,6 +308,112 @@ class MyArgs:  # pylint: disable=R0903; Too few public methods
             ),
         )
 
+        self.parser.add_argument(
+            "--docker-platform-workers",
+            type=int,
+            default=4,
+            help="Process the platform images of a multi platform docker image with this many workers; default 4.",
+        )
+
+        self.parser.add_argument(
+            "--repo-db-memory-items",
+            type=int,
+            default=REPO_DB_MEMORY_ITEMS,
+            help="Meta and manifest entries per repo kept in memory, the rest goes to a temporary file; "
+            + f"default {REPO_DB_MEMORY_ITEMS}.",
+        )
+
+        self.parser.add_argument(
+            "--dedupe-by-digest",
+            action="store_true",
+            help="Scan identical artifacts (same sha256 or docker config digest) only once per run, "
+            + "all copies get the properties of the first scan.",
+        )
+
+        self.parser.add_argument(
+            "--schedule",
+            choices=SCHEDULE_POLICIES,
+            default=SCHEDULE_LISTING,
+            help="The order in which the artifacts of a repo are processed; default: the order of the listing.",
+        )
+
+        self.parser.add_argument(
+            "--byte-budget",
+            type=str,
+            default=None,
+            help="Stop starting new scans after this many bytes were processed in this run, e.g. 500M, 20G.",
+        )
+
+        self.parser.add_argument(
+            "--shard",
+            type=str,
+            default=None,
+            help="Process only shard K of N of every repo, e.g. 1/3; run N processes to share the work; default all.",
+        )
+
+        self.parser.add_argument(
+            "--lease",
+            action="store_true",
+            help="Claim every item with a RL.lease property before processing, so multiple processes can share repos.",
+        )
+
+        self.parser.add_argument(
+            "--lease-owner",
+            type=str,
+            default=None,
+            help="The owner id in the lease; default <hostname>-<pid>.",
+        )
+
+        self.parser.add_argument(
+            "--lease-ttl",
+            type=int,
+            default=LEASE_TTL,
+            help=f"Seconds after which a lease of a crashed process may be taken over; default {LEASE_TTL}.",
+        )
+
+        self.parser.add_argument(
+            "--state-dir",
+            type=str,
+            default=None,
+            help="An existing directory to keep state between runs (e.g. parsed .rl_meta files); default none.",
+        )
+
+        self.parser.add_argument(
+            "--watermark",
+            action="store_true",
+            help="Only list items modified since the last complete run of a repo (needs aql and --state-dir).",
+        )
+
+        self.parser.add_argument(
+            "--artifactory-rate",
+            type=str,
+            default=None,
+            help="Max requests per second to Artifactory: one number for every request class "
+            + "or per class, e.g. read=20,write=5,search=2,download=10; default unlimited.",
+        )
+
+        self.parser.add_argument(
+            "--artifactory-bandwidth",
+            type=str,
+            default=None,
+            help="Max download bytes per second from Artifactory, e.g. 50M; default unlimited.",
+        )
+
+        self.parser.add_argument(
+            "--adaptive-concurrency",
+            action="store_true",
+            help="Adapt the downloads, uploads and property calls in flight to the observed latency and throttling "
+            + "of Artifactory and the portal.",
+        )
+
+        self.parser.add_argument(
+            "--adaptive-max-in-flight",
+            type=int,
+            default=ADAPTIVE_MAX_IN_FLIGHT,
+            help="The max requests in flight per operation with --adaptive-concurrency; "
+            + f"default {ADAPTIVE_MAX_IN_FLIGHT}.",
+        )
+
         self.parser.add_argument(
             "--ignore-cert-errors",
             action="store_true",
@@ -307,4 +445,12 @@ class MyArgs:  # pylint: disable=R0903; Too few public methods
 
         repo_list = self.mandatory_repo(args)
         args["repo"] = repo_list
+
+        state_dir = args.get("state_dir")
+        if state_dir is not None and not os.path.isdir(state_dir):
+            raise SpectraAssureInvalidAction(f"--state-dir must be a existing directory: {state_dir}")
+
+        if args.get("watermark") is True and state_dir is None:
+            raise SpectraAssureInvalidAction("--watermark needs a --state-dir to keep the watermarks")
+
         return args
@@ -1,12 +1,17 @@
-from .name_mangler_debian import NameManglerDebian as NameManglerDebian
-from .name_mangler_default import NameManglerDefault as NameManglerDefault
-from .name_mangler_docker import NameManglerDocker as NameManglerDocker
-from .name_mangler_gems import NameManglerGems as NameManglerGems
-from .name_mangler_generic import NameManglerGeneric as NameManglerGeneric
-from .name_mangler_maven import NameManglerMaven as NameManglerMaven
-from .name_mangler_npm import NameManglerNpm as NameManglerNpm
-from .name_mangler_pypi import NameManglerPypi as NameManglerPypi
-from .name_mangler_rpm import NameManglerRpm as NameManglerRpm
+from typing import TYPE_CHECKING
+
+from ..helpers import lazy_module_getattr
+
+if TYPE_CHECKING:
+    from .name_mangler_debian import NameManglerDebian as NameManglerDebian
+    from .name_mangler_default import NameManglerDefault as NameManglerDefault
+    from .name_mangler_docker import NameManglerDocker as NameManglerDocker
+    from .name_mangler_gems import NameManglerGems as NameManglerGems
+    from .name_mangler_generic import NameManglerGeneric as NameManglerGeneric
+    from .name_mangler_maven import NameManglerMaven as NameManglerMaven
+    from .name_mangler_npm import NameManglerNpm as NameManglerNpm
+    from .name_mangler_pypi import NameManglerPypi as NameManglerPypi
+    from .name_mangler_rpm import NameManglerRpm as NameManglerRpm
 
 __all__ = [
     "NameManglerDebian",
@@ -19,3 +24,18 @@ __all__ = [
     "NameManglerPypi",
     "NameManglerRpm",
 ]
+
+__getattr__ = lazy_module_getattr(
+    __name__,
+    {
+        "NameManglerDebian": ".name_mangler_debian",
+        "NameManglerDefault": ".name_mangler_default",
+        "NameManglerDocker": ".name_mangler_docker",
+        "NameManglerGems": ".name_mangler_gems",
+        "NameManglerGeneric": ".name_mangler_generic",
+        "NameManglerMaven": ".name_mangler_maven",
+        "NameManglerNpm": ".name_mangler_npm",
+        "NameManglerPypi": ".name_mangler_pypi",
+        "NameManglerRpm": ".name_mangler_rpm",
+    },
+)
@@ -0,0 +1,182 @@
+# python3 ts=4space
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    List,
+    Set,
+)
+
+from .spectra_assure_api import SpectraAssureApi
+
+logger = logging.getLogger(__name__)
+
+"""
+Delete many projects from the portal.
+
+ - list the projects of the group, the packages of the selected projects and their versions, once.
+ - delete all versions with a bounded pool of workers, then the packages, then the projects.
+ - every call asks the sdk to adapt to the portal throttle: on a 429 it waits as the Retry-After header says.
+ - with a state file every finished delete is recorded, a interrupted cleanup continues where it stopped.
+"""
+
+
+class PortalCleanup:
+    def __init__(
+        self,
+        *,
+        spectra_assure_api: SpectraAssureApi,
+        workers: int = 4,
+        state_file: str | None = None,
+        dry_run: bool = False,
+    ) -> None:
+        self.api_client = spectra_assure_api.api_client
+        self.workers = max(1, workers)
+        self.state_file = state_file
+        self.dry_run = dry_run
+
+        self._lock = threading.Lock()
+        self.done: Set[str] = self._load_state()
+        self.failed: List[str] = []
+
+    def _load_state(
+        self,
+    ) -> Set[str]:
+        done: Set[str] = set()
+        if self.state_file is None or not os.path.exists(self.state_file):
+            return done
+
+        with open(self.state_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    done.add(json.loads(line)["deleted"])
+
+        logger.info("resume: %d deletes already done", len(done))
+        return done
+
+    def _mark_done(
+        self,
+        what: str,
+    ) -> None:
+        with self._lock:
+            self.done.add(what)
+            if self.state_file is None:
+                return
+            with open(self.state_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"deleted": what}) + "\n")
+
+    @staticmethod
+    def _names(
+        data: Any,
+        key: str,
+        name_key: str,
+    ) -> List[str]:
+        out: List[str] = []
+        for item in data.get(key, []) if isinstance(data, dict) else []:
+            if isinstance(item, dict) and item.get(name_key):
+                out.append(str(item[name_key]))
+            elif isinstance(item, str):
+                out.append(item)
+        return out
+
+    def _list(
+        self,
+        project: str | None = None,
+        package: str | None = None,
+    ) -> Any:
+        rr = self.api_client.list(
+            project=project,
+            package=package,
+            auto_adapt_to_throttle=True,
+        )
+        if rr.status_code < 200 or rr.status_code >= 300:
+            logger.error("list failed (%d): %s %s", rr.status_code, project, package)
+            return {}
+        return rr.json()
+
+    def list_projects(
+        self,
+    ) -> List[str]:
+        return self._names(self._list(), "projects", "name")
+
+    def _list_versions_one_package(
+        self,
+        project: str,
+        package: str,
+    ) -> List[str]:
+        data = self._list(project=project, package=package)
+        return [f"{project}/{package}@{v}" for v in self._names(data, "versions", "version")]
+
+    def _list_packages_one_project(
+        self,
+        project: str,
+    ) -> List[str]:
+        data = self._list(project=project)
+        return [f"{project}/{p}" for p in self._names(data, "packages", "name")]
+
+    def _map(
+        self,
+        func: Callable[[str], Any],
+        items: List[str],
+    ) -> List[Any]:
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(func, items))
+
+    def _delete_one(
+        self,
+        what: str,  # project, project/package or project/package@version
+    ) -> bool:
+        if what in self.done:
+            return True
+
+        if self.dry_run:
+            print(f"# would delete: {what}")
+            return True
+
+        project, _, rest = what.partition("/")
+        package, _, version = rest.partition("@")
+
+        rr = self.api_client.delete(
+            project=project,
+            package=package or None,
+            version=version or None,
+            auto_adapt_to_throttle=True,
+        )
+        if rr.status_code == 404 or 200 <= rr.status_code < 300:
+            logger.info("delete: %s %s", what, rr.status_code)
+            self._mark_done(what)
+            return True
+
+        logger.critical("delete: %s %s %s", what, rr.status_code, rr.text)
+        with self._lock:
+            self.failed.append(what)
+        return False
+
+    # PUBLIC
+
+    def cleanup(
+        self,
+        projects: List[str],
+    ) -> None:
+        """delete the projects with all their packages and versions"""
+        projects = [p for p in projects if p not in self.done]
+
+        packages = [p for pp in self._map(self._list_packages_one_project, projects) for p in pp]
+        packages = [p for p in packages if p not in self.done]
+
+        def versions_one(package: str) -> List[str]:
+            project, _, name = package.partition("/")
+            return self._list_versions_one_package(project, name)
+
+        versions = [v for vv in self._map(versions_one, packages) for v in vv]
+        print(f"# projects: {len(projects)}, packages: {len(packages)}, versions: {len(versions)}")
+
+        for level in [versions, packages, projects]:
+            self._map(self._delete_one, level)
+
+        print(f"# deleted: {len(self.done)}, failed: {len(self.failed)}")
@@ -1,11 +1,25 @@
 # python3; ts=4space
 
-from .scan_cli_base import ScanCliBase as ScanCliBase
-from .scan_cli_local import ScanCliLocal as ScanCliLocal
-from .scan_cli_docker import ScanCliDocker as ScanCliDocker
+from typing import TYPE_CHECKING
+
+from ..helpers import lazy_module_getattr
+
+if TYPE_CHECKING:
+    from .scan_cli_base import ScanCliBase as ScanCliBase
+    from .scan_cli_local import ScanCliLocal as ScanCliLocal
+    from .scan_cli_docker import ScanCliDocker as ScanCliDocker
 
 __all__ = [
     "ScanCliBase",
     "ScanCliLocal",
     "ScanCliDocker",
 ]
+
+__getattr__ = lazy_module_getattr(
+    __name__,
+    {
+        "ScanCliBase": ".scan_cli_base",
+        "ScanCliLocal": ".scan_cli_local",
+        "ScanCliDocker": ".scan_cli_docker",
+    },
+)
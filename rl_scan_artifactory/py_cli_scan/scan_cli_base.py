@@ -36,6 +36,7 @@ class ScanCliBase:
     scan_status: int | None
     store: str | None = None
     reports_list: List[str]
+    compress_level: int | None = None
 
     def __init__(
         self,
@@ -44,10 +45,12 @@ class ScanCliBase:
         store: str | None = None,
         temp_dir_path: str | None = None,  # you handle temp_dir yourself, must be empty
         reports_list: List[str] | None = None,
+        compress_level: int | None = None,  # None: store only, 0-9 deflate the reports bundle
     ) -> None:
         # ----------------------------------------
         self.temp_dir = None  # must be first
         self.reports_list = [] if reports_list is None else reports_list
+        self.compress_level = compress_level
         # ----------------------------------------
         self.purl: str = purl
         self.store = store
@@ -139,22 +142,31 @@ class ScanCliBase:
 
         reports_bundle_path = f"{reports_folder}/{bundle_name}"
 
+        compression = zipfile.ZIP_STORED
+        if self.compress_level is not None:
+            compression = zipfile.ZIP_DEFLATED
+
         # reports.rl-safe will be put in the regular reports dir when requested with --pack-safe
-        with zipfile.ZipFile(reports_bundle_path, "w") as outzip:
+        with zipfile.ZipFile(
+            reports_bundle_path,
+            "w",
+            compression=compression,
+            compresslevel=self.compress_level,
+        ) as outzip:
             for subdir, dirs, files in os.walk(reports_folder):
                 logger.debug("%s %s %s ", subdir, dirs, files)
 
-                for file in files:  # Read file
+                for file in files:
                     if file == bundle_name:  # skip myself
                         continue
 
                     source_path = os.path.join(subdir, file)
                     dstpath_in_zip = os.path.relpath(source_path, start=reports_folder)
-                    with open(source_path, "rb") as infile:  # Write to zip
-                        outzip.writestr(
-                            dstpath_in_zip,
-                            infile.read(),
-                        )
+                    # write() copies the file in chunks, large sbom files are never read in memory as a whole
+                    outzip.write(
+                        source_path,
+                        arcname=dstpath_in_zip,
+                    )
 
         arr = os.listdir(reports_folder)
         logger.debug("temp dir files: %s", arr)
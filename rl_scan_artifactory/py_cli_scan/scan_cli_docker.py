@@ -34,6 +34,7 @@ class ScanCliDocker(
         store: str | None = None,
         temp_dir_path: str | None = None,  # you handle temp_dir yourself, must be empy
         reports_list: List[str] | None = None,
+        compress_level: int | None = None,
     ) -> None:
         # later: add rl-store external to docker
 
@@ -42,6 +43,7 @@ class ScanCliDocker(
             temp_dir_path=temp_dir_path,
             store=store,
             reports_list=reports_list,
+            compress_level=compress_level,
         )
 
         self.RLSECURE_ENCODED_LICENSE: str = encoded_license
@@ -29,12 +29,14 @@ class ScanCliLocal(
         store: str | None = None,
         temp_dir_path: str | None = None,  # you handle temp_dir yourself, must be empty
         reports_list: List[str] | None = None,
+        compress_level: int | None = None,
     ) -> None:
         super().__init__(
             purl=purl,
             store=store,
             temp_dir_path=temp_dir_path,
             reports_list=reports_list,
+            compress_level=compress_level,
         )
 
         self.where: str = where
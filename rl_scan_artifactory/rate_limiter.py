@@ -0,0 +1,148 @@
+# python3 ts=4space
+import logging
+import threading
+import time
+from typing import (
+    Dict,
+)
+
+from .exceptions import SpectraAssureInvalidAction
+from .helpers import parse_size
+
+logger = logging.getLogger(__name__)
+
+"""
+Limit how hard we hit Artifactory, shared by all workers that use the same ArtifactoryApi.
+
+Requests are split in classes, each with its own token bucket (requests per second):
+ - read:     GET storage info, properties and listings,
+ - write:    PUT, DELETE, PATCH of properties and uploads,
+ - search:   AQL and other POST queries,
+ - download: the GET of a artifact or small object.
+The bytes of downloads have one more bucket (bytes per second), taken per chunk.
+
+A bucket allows a burst of one second worth of tokens.
+Tokens are reserved under the lock and the wait is done outside it,
+so waiting workers do not block each other and are served in order of arrival.
+"""
+
+REQUEST_CLASS_READ = "read"
+REQUEST_CLASS_WRITE = "write"
+REQUEST_CLASS_SEARCH = "search"
+REQUEST_CLASS_DOWNLOAD = "download"
+
+REQUEST_CLASSES = [
+    REQUEST_CLASS_READ,
+    REQUEST_CLASS_WRITE,
+    REQUEST_CLASS_SEARCH,
+    REQUEST_CLASS_DOWNLOAD,
+]
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,  # tokens per second
+        burst: float | None = None,  # default: rate, one second worth
+    ) -> None:
+        assert rate > 0
+        self.rate = rate
+        self.capacity = burst if burst is not None else rate
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(
+        self,
+        amount: float,
+    ) -> float:
+        """take the tokens, possibly going into debt; return the seconds to wait until they are covered"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(
+        self,
+        amount: float = 1.0,
+    ) -> None:
+        wait = self._reserve(amount)
+        if wait > 0:
+            time.sleep(wait)
+
+
+def parse_request_rates(
+    rates: str | None,
+) -> Dict[str, float]:
+    """'10' -> 10/s for every class; 'read=20,write=5' -> per class, the others unlimited"""
+    if rates is None or rates.strip() == "":
+        return {}
+
+    try:
+        if "=" not in rates:
+            rate = float(rates)
+            return {name: rate for name in REQUEST_CLASSES if rate > 0}
+
+        result: Dict[str, float] = {}
+        for part in rates.split(","):
+            name, _, value = part.partition("=")
+            name = name.strip().lower()
+            if name not in REQUEST_CLASSES:
+                raise ValueError(name)
+            if float(value) > 0:
+                result[name] = float(value)
+        return result
+
+    except ValueError as e:
+        msg = (
+            f"invalid request rate: {rates}; use e.g. 10 or read=20,write=5 with classes: {', '.join(REQUEST_CLASSES)}"
+        )
+        raise SpectraAssureInvalidAction(message=msg) from e
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        request_rates: Dict[str, float] | None = None,  # requests per second per class, missing: unlimited
+        download_bytes_rate: int = 0,  # bytes per second, 0: unlimited
+    ) -> None:
+        self.requests: Dict[str, TokenBucket] = {
+            name: TokenBucket(rate=rate) for name, rate in (request_rates or {}).items()
+        }
+        self.download_bytes: TokenBucket | None = None
+        if download_bytes_rate > 0:
+            self.download_bytes = TokenBucket(rate=float(download_bytes_rate))
+
+        if self.requests or self.download_bytes:
+            logger.info("rate limits: %s, download bytes/s: %s", request_rates, download_bytes_rate)
+
+    @classmethod
+    def from_args(
+        cls,
+        request_rates: str | None,
+        download_bandwidth: str | None,
+    ) -> "RateLimiter":
+        return cls(
+            request_rates=parse_request_rates(request_rates),
+            download_bytes_rate=parse_size(download_bandwidth, what="download bandwidth"),
+        )
+
+    def request(
+        self,
+        request_class: str,
+    ) -> None:
+        bucket = self.requests.get(request_class)
+        if bucket is not None:
+            bucket.acquire()
+
+    def downloaded(
+        self,
+        n_bytes: int,
+    ) -> None:
+        if self.download_bytes is not None and n_bytes > 0:
+            self.download_bytes.acquire(n_bytes)
@@ -0,0 +1,175 @@
+# python3 ts=4space
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    Iterator,
+    MutableMapping,
+)
+
+from .constants import REPO_DB_MEMORY_ITEMS
+
+logger = logging.getLogger(__name__)
+
+"""
+The repo_db collects, per repo, info that other artifacts need later:
+the parsed .rl_meta files of a generic repo and the platform manifests of docker image indexes.
+
+The most recently used entries are kept in memory,
+the least recently used are moved to a sqlite file in the download dir when there are more then 'memory_items'.
+A entry is in memory or on disk, never both; the values must be json serializable.
+The sqlite file is removed on close().
+"""
+
+
+class RepoDb(MutableMapping[str, Any]):
+    def __init__(
+        self,
+        memory_items: int = REPO_DB_MEMORY_ITEMS,
+        spill_dir: str | None = None,  # default: the system temp dir
+    ) -> None:
+        self.memory_items = max(1, memory_items)
+        self.spill_dir = spill_dir
+
+        self._lock = threading.RLock()
+        self._front: OrderedDict[str, Any] = OrderedDict()
+        self._n_disk = 0
+        self._db: sqlite3.Connection | None = None
+        self._db_path: str | None = None
+
+    def _open_db(
+        self,
+    ) -> sqlite3.Connection:
+        if self._db is None:
+            fd, self._db_path = tempfile.mkstemp(prefix="repo_db_", suffix=".sqlite", dir=self.spill_dir)
+            os.close(fd)
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT NOT NULL)")
+            logger.debug("repo_db spills to: %s", self._db_path)
+
+        return self._db
+
+    def _spill(
+        self,
+    ) -> None:
+        """move the least recently used entries to disk"""
+        if len(self._front) <= self.memory_items:
+            return
+
+        rows = []
+        while len(self._front) > self.memory_items:
+            k, v = self._front.popitem(last=False)
+            rows.append((k, json.dumps(v)))
+
+        db = self._open_db()
+        db.executemany("INSERT OR REPLACE INTO kv (k, v) VALUES (?, ?)", rows)
+        self._n_disk += len(rows)
+
+    def _disk_pop(
+        self,
+        key: str,
+    ) -> Any:
+        if self._db is None or self._n_disk == 0:
+            raise KeyError(key)
+
+        row = self._db.execute("SELECT v FROM kv WHERE k = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+
+        self._db.execute("DELETE FROM kv WHERE k = ?", (key,))
+        self._n_disk -= 1
+        return json.loads(row[0])
+
+    def __getitem__(
+        self,
+        key: str,
+    ) -> Any:
+        with self._lock:
+            if key in self._front:
+                self._front.move_to_end(key)
+                return self._front[key]
+
+            value = self._disk_pop(key)  # promote to memory
+            self._front[key] = value
+            self._spill()
+            return value
+
+    def __setitem__(
+        self,
+        key: str,
+        value: Any,
+    ) -> None:
+        with self._lock:
+            if key not in self._front and self._db is not None and self._n_disk > 0:
+                try:
+                    self._disk_pop(key)
+                except KeyError:
+                    pass
+
+            self._front[key] = value
+            self._front.move_to_end(key)
+            self._spill()
+
+    def __delitem__(
+        self,
+        key: str,
+    ) -> None:
+        with self._lock:
+            if key in self._front:
+                del self._front[key]
+                return
+            self._disk_pop(key)
+
+    def __contains__(
+        self,
+        key: object,
+    ) -> bool:
+        with self._lock:
+            if key in self._front:
+                return True
+            if self._db is None or self._n_disk == 0:
+                return False
+            return self._db.execute("SELECT 1 FROM kv WHERE k = ?", (key,)).fetchone() is not None
+
+    def __iter__(
+        self,
+    ) -> Iterator[str]:
+        with self._lock:
+            keys = list(self._front.keys())
+            if self._db is not None:
+                keys.extend(row[0] for row in self._db.execute("SELECT k FROM kv"))
+        return iter(keys)
+
+    def __len__(
+        self,
+    ) -> int:
+        with self._lock:
+            return len(self._front) + self._n_disk
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"RepoDb(memory: {len(self._front)}, disk: {self._n_disk})"
+
+    def close(
+        self,
+    ) -> None:
+        with self._lock:
+            self._front.clear()
+            self._n_disk = 0
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            if self._db_path is not None:
+                try:
+                    os.remove(self._db_path)
+                except OSError as e:
+                    logger.warning("cannot remove: %s; %s", self._db_path, e)
+                self._db_path = None
@@ -58,6 +58,7 @@ class ScanCli:
             store=store,
             temp_dir_path=self.temp_dir_name,
             reports_list=self.cli_args.get("reports_requested", []),
+            compress_level=self.cli_args.get("cli_reports_compress_level"),
         )
 
         if sync_requested:
@@ -96,6 +97,7 @@ class ScanCli:
             store=store,
             temp_dir_path=self.temp_dir_name,
             reports_list=self.cli_args.get("reports_requested", []),
+            compress_level=self.cli_args.get("cli_reports_compress_level"),
         )
 
         if sync_requested:
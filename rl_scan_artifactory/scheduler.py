@@ -0,0 +1,135 @@
+# python3 ts=4space
+import hashlib
+import logging
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+)
+
+from .constants import (
+    SCHEDULE_LISTING,
+    SCHEDULE_POLICIES,
+)
+from .exceptions import (
+    SpectraAssureInvalidAction,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+Order the work queue of one repo.
+
+The storage api lists items in path order, so a fresh small artifact may wait behind a multi GB iso.
+The policy uses the lastModified and size fields of the listing:
+
+ - listing:       keep the order of the listing (default)
+ - newest-first:  most recently modified first
+ - oldest-first:  least recently modified first
+ - smallest-first
+ - largest-first
+
+With --shard K/N the work of one repo is split over N independent processes:
+every item belongs to exactly one shard by a stable hash of the repo name and its path,
+for docker the image path, so all manifests of one image are processed by the same shard.
+"""
+
+
+def _item_modified(
+    item: Dict[str, Any],
+) -> float:
+    # 2024-01-31T12:34:56.789Z or 2024-01-31T12:34:56.789+01:00
+    lm = str(item.get("lastModified") or "")
+    if lm == "":
+        return 0.0
+
+    try:
+        return datetime.fromisoformat(lm.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        logger.debug("unknown lastModified format: %s", lm)
+        return 0.0
+
+
+def _item_size(
+    item: Dict[str, Any],
+) -> int:
+    try:
+        return int(item.get("size") or 0)
+    except ValueError:
+        return 0
+
+
+def schedule_items(
+    items: List[Dict[str, Any]],
+    policy: str | None,
+) -> List[Dict[str, Any]]:
+    """return the items in the order of the policy, sorting is stable so equal items keep their listing order"""
+    if policy is None or policy == SCHEDULE_LISTING:
+        return items
+
+    keys: Dict[str, Callable[[Dict[str, Any]], float]] = {
+        "newest-first": lambda item: -_item_modified(item),
+        "oldest-first": _item_modified,
+        "smallest-first": lambda item: float(_item_size(item)),
+        "largest-first": lambda item: float(-_item_size(item)),
+    }
+
+    if policy not in keys:
+        msg = f"unknown schedule policy: {policy}; use one of: {', '.join(SCHEDULE_POLICIES)}"
+        raise SpectraAssureInvalidAction(message=msg)
+
+    return sorted(items, key=keys[policy])
+
+
+def parse_shard(
+    shard: str | None,
+) -> Tuple[int, int] | None:
+    """'2/4' -> (2, 4): process shard 2 of 4 (1 based); None means no sharding"""
+    if shard is None or shard.strip() == "":
+        return None
+
+    try:
+        k, n = (int(x) for x in shard.strip().split("/"))
+    except ValueError as e:
+        msg = f"invalid shard: {shard}; use K/N, e.g. 1/3"
+        raise SpectraAssureInvalidAction(message=msg) from e
+
+    if n < 1 or k < 1 or k > n:
+        msg = f"invalid shard: {shard}; K must be between 1 and N"
+        raise SpectraAssureInvalidAction(message=msg)
+
+    return k, n
+
+
+def _shard_key(
+    repo_name: str,
+    p_type: str,
+    uri: str,
+) -> str:
+    if p_type == "docker":
+        # /<image>/<tag>/manifest.json, /<image>/<tag>/list.manifest.json, /<image>/sha256__<hex>/manifest.json
+        uri = "/".join(uri.split("/")[:-2])
+    return f"{repo_name}:{uri}"
+
+
+def shard_items(
+    items: List[Dict[str, Any]],
+    repo_name: str,
+    p_type: str,
+    shard: Tuple[int, int] | None,
+) -> List[Dict[str, Any]]:
+    """only the items of this shard, the same on every host and every run"""
+    if shard is None or shard[1] == 1:
+        return items
+
+    k, n = shard
+
+    def in_shard(item: Dict[str, Any]) -> bool:
+        key = _shard_key(repo_name, p_type, str(item.get("uri", "")))
+        h = int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big")
+        return h % n == k - 1
+
+    return [item for item in items if in_shard(item)]
@@ -1,10 +1,23 @@
-from .simple_data_default import SimpleDataDefault as SimpleDataDefault
-from .simple_data_docker import SimpleDataDocker as SimpleDataDocker
-from .simple_data_maven import SimpleDataMaven as SimpleDataMaven
+from typing import TYPE_CHECKING
 
+from ..helpers import lazy_module_getattr
+
+if TYPE_CHECKING:
+    from .simple_data_default import SimpleDataDefault as SimpleDataDefault
+    from .simple_data_docker import SimpleDataDocker as SimpleDataDocker
+    from .simple_data_maven import SimpleDataMaven as SimpleDataMaven
 
 __all__ = [
     "SimpleDataDefault",
     "SimpleDataDocker",
     "SimpleDataMaven",
 ]
+
+__getattr__ = lazy_module_getattr(
+    __name__,
+    {
+        "SimpleDataDefault": ".simple_data_default",
+        "SimpleDataDocker": ".simple_data_docker",
+        "SimpleDataMaven": ".simple_data_maven",
+    },
+)
@@ -1,24 +1,58 @@
 import logging
+import time
+from datetime import (
+    datetime,
+    timezone,
+)
+from email.utils import parsedate_to_datetime
 from typing import (
+    Callable,
     Tuple,
     Dict,
     Any,
 )
 
-from spectra_assure_api_client import SpectraAssureApiOperations  # SDK
-
+from .adaptive_concurrency import (
+    AdaptiveConcurrency,
+    OPERATION_PROPERTY,
+    OPERATION_UPLOAD,
+)
 from .app_base_with_logging import AppBaseWithLogging
 from .fileinfo import FileInfo
 from .my_args import MyArgs
 from .constants import (
+    ADAPTIVE_MAX_IN_FLIGHT,
     PORTAL_UPLOAD_TIMEOUT,
     DEFAULT_DIGEST_TYPE,
+    PORTAL_THROTTLE_ATTEMPTS,
+    PORTAL_THROTTLE_FALLBACK_DELAY,
+    PORTAL_THROTTLE_MAX_DELAY,
+    THROTTLE_STATUS_CODES,
 )
 
 
 logger = logging.getLogger(__name__)
 
 
+def throttle_delay(
+    response: Any,
+) -> int:
+    """seconds to wait from the Retry-After header: seconds or a http date"""
+    retry_after = str(response.headers.get("Retry-After") or "").strip()
+    if retry_after.isdigit():
+        return int(retry_after)
+
+    try:
+        when = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return PORTAL_THROTTLE_FALLBACK_DELAY
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    seconds = int((when - datetime.now(timezone.utc)).total_seconds())
+    return min(max(0, seconds), PORTAL_THROTTLE_MAX_DELAY)
+
+
 class SpectraAssureApi(
     AppBaseWithLogging,
 ):
@@ -48,6 +82,9 @@ class SpectraAssureApi(
         if proxy_port:
             proxy_port = int(proxy_port)
 
+        # the SDK is only needed for the portal backend, import it when we actually connect
+        from spectra_assure_api_client import SpectraAssureApiOperations  # SDK
+
         # very large uploads will need a bit bigger timeout
         self.api_client = SpectraAssureApiOperations(
             host=self.host,
@@ -67,6 +104,49 @@ class SpectraAssureApi(
             proxy_password=proxy_password,
         )
 
+        # the sdk backs off on throttling per request, this limits the requests in flight,
+        # with --adaptive-concurrency we do the back off ourselves, see call()
+        self.concurrency = AdaptiveConcurrency(
+            operations=[OPERATION_UPLOAD, OPERATION_PROPERTY],
+            enabled=self.cli_args.get("adaptive_concurrency") is True,
+            max_in_flight=int(self.cli_args.get("adaptive_max_in_flight") or ADAPTIVE_MAX_IN_FLIGHT),
+        )
+
+    def call(
+        self,
+        operation: str,
+        call: Callable[..., Any],
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Call the sdk in a slot of the adaptive limit for this operation.
+        The sdk would retry a 429 internally and only return the last response,
+        so here it does not retry: each 429 or 503 reaches the limit before we wait as Retry-After says.
+        """
+        if operation not in self.concurrency.limits:
+            return call(**kwargs)
+
+        attempt = 1
+        while True:
+            with self.concurrency.slot(operation) as slot:
+                response = call(auto_adapt_to_throttle=False, **kwargs)
+                slot.done(response)
+
+            if response.status_code not in THROTTLE_STATUS_CODES or attempt >= PORTAL_THROTTLE_ATTEMPTS:
+                return response
+
+            delay = throttle_delay(response)
+            logger.warning(
+                "portal throttle %d: %s attempt %d of %d, waiting %ds",
+                response.status_code,
+                operation,
+                attempt,
+                PORTAL_THROTTLE_ATTEMPTS,
+                delay,
+            )
+            time.sleep(delay)
+            attempt += 1
+
     def status_version(
         self,
         project: str,
@@ -77,7 +157,9 @@ class SpectraAssureApi(
         #  then we may  not have this info yet
         qp: Dict[str, Any] = {}
 
-        version_check_response = self.api_client.status(
+        version_check_response = self.call(
+            OPERATION_PROPERTY,
+            self.api_client.status,
             project=project,
             package=package,
             version=version,
@@ -109,7 +191,9 @@ class SpectraAssureApi(
             with_compare_digest = False  # it seems the sha is not always identical
 
         # exists ?
-        version_info = self.api_client.list(
+        version_info = self.call(
+            OPERATION_PROPERTY,
+            self.api_client.list,
             project=project,
             package=package,
             version=version,
@@ -191,7 +275,9 @@ class SpectraAssureApi(
         }
 
         # create a version with upload (scan)
-        rr = self.api_client.scan(
+        rr = self.call(
+            OPERATION_UPLOAD,
+            self.api_client.scan,
             project=project,
             package=package,
             version=version,
@@ -218,7 +304,9 @@ class SpectraAssureApi(
             }
             logger.debug("qp: %s", str(qp))
 
-            rr = self.api_client.edit(
+            rr = self.call(
+                OPERATION_PROPERTY,
+                self.api_client.edit,
                 project=project,
                 package=package,
                 version=version,
@@ -0,0 +1,138 @@
+# python3 ts=4space
+import datetime
+import json
+import logging
+import os
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+With --watermark we remember per repo the newest 'lastModified' of the items we listed,
+in the state dir, but only if the repo was processed completely.
+Items that did not reach a final state (a failed download or upload, leased by a other process)
+cap the watermark just before the oldest of them, so the next run lists them again.
+A docker platform manifest.json is listed with the list.manifest.json files of its image.
+
+The next run lists only the items modified after that (aql: modified $gt <watermark>),
+plus the items that are uploaded to the portal but have no scan result yet.
+"""
+
+WATERMARK_FILE = "repo_watermarks.json"
+
+
+def _parse_timestamp(
+    timestamp: str,
+) -> datetime.datetime | None:
+    try:
+        dt = datetime.datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc)
+
+
+def _format_timestamp(
+    dt: datetime.datetime,
+) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def newest_modified(
+    items: List[Dict[str, Any]],
+    since: str | None = None,
+) -> str | None:
+    """the newest lastModified of the items (or since if that is newer) as utc iso string for aql"""
+    candidates = [str(item.get("lastModified") or "") for item in items]
+    if since is not None:
+        candidates.append(since)
+
+    newest: datetime.datetime | None = None
+    for timestamp in candidates:
+        dt = _parse_timestamp(timestamp)
+        if dt is not None and (newest is None or dt > newest):
+            newest = dt
+
+    if newest is None:
+        return None
+
+    return _format_timestamp(newest)
+
+
+def cap_watermark(
+    watermark: str,
+    unfinished: List[Dict[str, Any]],
+    since: str | None = None,
+) -> str | None:
+    """
+    the watermark, but before the lastModified of the oldest unfinished item,
+    not older then since (the previous watermark): older items are listed again for a other reason
+    (pending on the portal, meta file, image index).
+    returns since if a unfinished item has no lastModified.
+    """
+    capped = _parse_timestamp(watermark)
+    if capped is None:
+        return since
+
+    for item in unfinished:
+        dt = _parse_timestamp(str(item.get("lastModified") or ""))
+        if dt is None:
+            logger.warning("no lastModified on unfinished item: %s; keep the watermark", item.get("uri"))
+            return since
+        capped = min(capped, dt - datetime.timedelta(milliseconds=1))  # aql: modified $gt watermark
+
+    previous = None if since is None else _parse_timestamp(since)
+    if previous is not None and previous > capped:
+        return since
+
+    return _format_timestamp(capped)
+
+
+class Watermarks:
+    def __init__(
+        self,
+        state_dir: str,
+    ) -> None:
+        self.path = os.path.join(state_dir, WATERMARK_FILE)
+        self._entries: Dict[str, str] = {}
+        self._load()
+
+    def _load(
+        self,
+    ) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            logger.exception("ignore unreadable watermarks: %s; %s", self.path, e)
+            self._entries = {}
+
+    def get(
+        self,
+        repo_name: str,
+    ) -> str | None:
+        return self._entries.get(repo_name)
+
+    def set(
+        self,
+        repo_name: str,
+        timestamp: str,
+    ) -> None:
+        self._entries[repo_name] = timestamp
+
+    def save(
+        self,
+    ) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
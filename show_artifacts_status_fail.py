@@ -1,14 +1,65 @@
 #! /usr/bin/env python3
+import argparse
+import csv
+import json
 import logging
+import sys
+
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    TextIO,
+)
 
 from rl_scan_artifactory import (
     MyArgs,
 )
 from rl_scan_artifactory.app_base_with_logging import AppBaseWithLogging
 from rl_scan_artifactory.artifactory_api import ArtifactoryApi
+from rl_scan_artifactory.constants import (
+    AQL_PAGE_SIZE,
+    PROP_NAME_SPECTRA_ASSURE_PURL,
+    PROP_NAME_SPECTRA_ASSURE_SCAN_REPORT,
+    PROP_NAME_SPECTRA_ASSURE_SCAN_STATUS,
+    PROP_NAME_SPECTRA_ASSURE_TIMESTAMP,
+)
 
 logger = logging.getLogger(__name__)
 
+FIELDS: List[str] = [
+    "repo",
+    "uri",
+    "purl",
+    "report",
+    "timestamp",
+    "modified",
+]
+
+
+def add_extra_args(
+    parser: argparse.ArgumentParser,
+) -> None:
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl", "uri"],
+        default="uri",
+        help="Output format: csv, json lines or only the storage uri (default).",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=None,
+        help="Write the report to this file; default stdout.",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=AQL_PAGE_SIZE,
+        help=f"Items per aql request; default {AQL_PAGE_SIZE}.",
+    )
+
 
 class ArtifactoryCleanup(
     AppBaseWithLogging,
@@ -23,27 +74,81 @@ class ArtifactoryCleanup(
         self.verbose = self.cli_args["verbose"]
         logger.debug("%s", args.cli_args)
 
-    def run(
+    def _fail_items_one_repo(
         self,
-    ) -> None:
-        rr = self.artifactory_api.search_prop_fail()
-        logger.debug("%s", rr)
-        if "results" not in rr:
+        repo_name: str | None,
+    ) -> Iterator[Dict[str, Any]]:
+        items = self.artifactory_api.find_items_with_property_aql(
+            key=PROP_NAME_SPECTRA_ASSURE_SCAN_STATUS,
+            value="fail",
+            repo_name=repo_name,
+            props=[
+                PROP_NAME_SPECTRA_ASSURE_PURL,
+                PROP_NAME_SPECTRA_ASSURE_SCAN_REPORT,
+                PROP_NAME_SPECTRA_ASSURE_TIMESTAMP,
+            ],
+            page_size=self.cli_args.get("page_size", AQL_PAGE_SIZE),
+        )
+        if items is None:
+            logger.error("aql query failed for repo: %s", repo_name)
             return
 
-        for item in rr["results"]:
-            uri = item.get("uri")
-            if not uri:
-                continue
+        for item in items:
+            props = self.artifactory_api.aql_item_properties(item)
+            path = item.get("path", "")
+            name = item.get("name", "")
+            repo = item.get("repo", "")
+            uri = f"{repo}/{name}" if path in ["", "."] else f"{repo}/{path}/{name}"
+
+            yield {
+                "repo": repo,
+                "uri": f"{self.artifactory_api.get_base_url()}/api/storage/{uri}",
+                "purl": props.get(PROP_NAME_SPECTRA_ASSURE_PURL, ""),
+                "report": props.get(PROP_NAME_SPECTRA_ASSURE_SCAN_REPORT, "").strip(),
+                "timestamp": props.get(PROP_NAME_SPECTRA_ASSURE_TIMESTAMP, ""),
+                "modified": item.get("modified", ""),
+            }
 
-            repo_list = self.cli_args.get("repo")
-            if repo_list is None or len(repo_list) == 0:
-                print(uri)
-                continue
+    def _fail_items(
+        self,
+    ) -> Iterator[Dict[str, Any]]:
+        repo_list = self.cli_args.get("repo")
+        if repo_list is None or len(repo_list) == 0:
+            yield from self._fail_items_one_repo(None)
+            return
+
+        for repo_name in repo_list:
+            yield from self._fail_items_one_repo(repo_name)
+
+    def _write(
+        self,
+        out: TextIO,
+    ) -> None:
+        what = self.cli_args.get("format", "uri")
+
+        writer = None
+        if what == "csv":
+            writer = csv.DictWriter(out, fieldnames=FIELDS)
+            writer.writeheader()
+
+        for row in self._fail_items():
+            if writer is not None:
+                writer.writerow(row)
+            elif what == "jsonl":
+                out.write(json.dumps(row) + "\n")
+            else:
+                out.write(row["uri"] + "\n")
+
+    def run(
+        self,
+    ) -> None:
+        output = self.cli_args.get("output")
+        if output is None:
+            self._write(sys.stdout)
+            return
 
-            for repo in repo_list:
-                if f"/storage/{repo}/" in uri or f"/storage/{repo}-cache/" in uri:
-                    print(uri)
+        with open(output, "w", encoding="utf-8", newline="") as out:
+            self._write(out)
 
 
 def main() -> None:
@@ -55,6 +160,7 @@ def main() -> None:
     args = MyArgs(
         repo_list_may_be_empty=True,
         no_portal_or_cli=True,
+        add_extra_args=add_extra_args,
     )
 
     ac = ArtifactoryCleanup(args=args)
@@ -0,0 +1,236 @@
+#! /usr/bin/env python3
+import argparse
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+"""
+Measure the latency the rlBlock plugin adds to every download.
+
+Download the same urls many times, with some concurrency, and show the latency percentiles per url.
+Compare a url in a repo listed in 'never_block_repo_list' (no property lookup)
+with a url in a repo that is checked, and with the same urls on a Artifactory without the plugin.
+
+  python3 load_test.py \\
+    --url https://artifactory.example.com/artifactory/aaa/some/file.jar \\
+    --url https://artifactory.example.com/artifactory/ccc/some/file.jar \\
+    --requests 500 --concurrency 8
+
+Authentication uses ARTIFACTORY_USER + ARTIFACTORY_TOKEN or ARTIFACTORY_API_KEY from the environment.
+
+--self-test is a self-test of this script only, NOT a benchmark of rlBlock.groovy:
+a local http server serves a small body for every path and answers 403 for paths containing 'fail',
+after sleeping --self-test-delay-ms on paths that are not in a 'never-block' repo.
+The latencies it shows are that sleep plus the overhead of the harness;
+the latency of the plugin can only be measured against a real Artifactory with the plugin installed.
+"""
+
+
+class SelfTestHandler(BaseHTTPRequestHandler):
+    body: bytes = b"x" * 1024
+    delay_ms: float = 0.0
+
+    def do_GET(
+        self,
+    ) -> None:
+        # /artifactory/<repo>/<path>
+        parts = self.path.strip("/").split("/")
+        repo = parts[1] if len(parts) > 1 else ""
+
+        if not repo.startswith("never-block") and self.delay_ms > 0:
+            time.sleep(self.delay_ms / 1000.0)
+
+        if "fail" in self.path:
+            body = b'{"message": "Blocking download due to failed ReversingLabs assessment."}'
+            self.send_response(403)
+        else:
+            body = self.body
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(
+        self,
+        format: str,
+        *args: object,
+    ) -> None:
+        return
+
+
+def start_self_test_server(
+    delay_ms: float,
+) -> Tuple[ThreadingHTTPServer, str]:
+    SelfTestHandler.delay_ms = delay_ms
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SelfTestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    host, port = server.server_address[:2]
+    return server, f"http://{host!s}:{port}/artifactory"
+
+
+def make_session() -> requests.Session:
+    session = requests.Session()
+
+    api_key = os.getenv("ARTIFACTORY_API_KEY")
+    if api_key:
+        session.headers["X-JFrog-Art-Api"] = api_key
+        return session
+
+    user = os.getenv("ARTIFACTORY_USER")
+    token = os.getenv("ARTIFACTORY_TOKEN")
+    if user and token:
+        session.auth = (user, token)
+
+    return session
+
+
+def percentile(
+    values: List[float],
+    p: float,
+) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def run_one_url(
+    session: requests.Session,
+    url: str,
+    n_requests: int,
+    concurrency: int,
+) -> Tuple[List[float], Dict[int, int], int]:
+    def one(_: int) -> Tuple[float, int]:
+        start = time.perf_counter()
+        try:
+            r = session.get(url, timeout=60)
+            r.content  # read the whole body
+            status = r.status_code
+        except requests.RequestException as e:
+            logger.debug("%s: %s", url, e)
+            status = -1
+
+        return (time.perf_counter() - start) * 1000.0, status
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for ms, status in executor.map(one, range(n_requests)):
+            statuses[status] = statuses.get(status, 0) + 1
+            if status < 0:
+                errors += 1
+                continue
+            latencies.append(ms)
+
+    return latencies, statuses, errors
+
+
+def report(
+    url: str,
+    latencies: List[float],
+    statuses: Dict[int, int],
+    errors: int,
+) -> None:
+    print(f"# {url}")
+    print(f"  status: {dict(sorted(statuses.items()))}, errors: {errors}")
+    if len(latencies) == 0:
+        return
+
+    print(
+        "  ms: min {:.2f}, p50 {:.2f}, p95 {:.2f}, p99 {:.2f}, max {:.2f}, mean {:.2f}".format(
+            min(latencies),
+            percentile(latencies, 50),
+            percentile(latencies, 95),
+            percentile(latencies, 99),
+            max(latencies),
+            statistics.mean(latencies),
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure the download latency with the rlBlock plugin",
+    )
+    parser.add_argument(
+        "--url",
+        action="append",
+        default=[],
+        help="A download url; repeat the option to compare urls.",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="Downloads per url; default 200.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Parallel downloads; default 4.",
+    )
+    parser.add_argument(
+        "--self-test",
+        action="store_true",
+        help="Test this script against a local http server that only sleeps; this does not measure rlBlock.",
+    )
+    parser.add_argument(
+        "--self-test-delay-ms",
+        type=float,
+        default=0.0,
+        help="The sleep of the self-test server for repos not named 'never-block*'; default 0.",
+    )
+    args = parser.parse_args()
+
+    urls: List[str] = args.url
+    server = None
+    if args.self_test:
+        print("SELF-TEST: the server only sleeps --self-test-delay-ms, the results say nothing about rlBlock.groovy")
+        server, base = start_self_test_server(args.self_test_delay_ms)
+        if len(urls) == 0:
+            urls = [
+                f"{base}/never-block-local/a/file.jar",
+                f"{base}/maven-local/a/file.jar",
+                f"{base}/maven-local/a/fail.jar",
+            ]
+
+    if len(urls) == 0:
+        parser.error("specify at least one --url or use --self-test")
+
+    session = make_session()
+    try:
+        for url in urls:
+            latencies, statuses, errors = run_one_url(
+                session=session,
+                url=url,
+                n_requests=args.requests,
+                concurrency=args.concurrency,
+            )
+            report(url, latencies, statuses, errors)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,93 @@
 import org.apache.commons.io.*
 import org.artifactory.common.*
 import org.artifactory.fs.*
+import org.artifactory.md.Properties
 import org.artifactory.repo.*
 import org.artifactory.repo.RepoPath
 import org.artifactory.request.Request
 import org.artifactory.resource.*
 import org.artifactory.security.*
 import groovy.json.JsonBuilder
+import groovy.transform.Field
 
 // If conditions are met, block download by returning 403
 
+@Field final String pROPERTIESFILEPATH = 'plugins/rlBlock.properties'
+
+// The config is parsed once and only parsed again when rlBlock.properties changes on disk,
+// every download request reads the cached values.
+@Field volatile Map rlBlockConfig = null
+@Field volatile long rlBlockConfigModified = -1L
+
+Map getRlBlockConfig() {
+    File configFile = new File(ctx.artifactoryHome.etcDir, pROPERTIESFILEPATH)
+    long modified = configFile.lastModified()
+
+    Map current = rlBlockConfig
+    if (current != null && modified == rlBlockConfigModified) {
+        return current
+    }
+
+    synchronized (this) {
+        if (rlBlockConfig != null && modified == rlBlockConfigModified) {
+            return rlBlockConfig
+        }
+
+        ConfigObject config = new ConfigSlurper().parse(configFile.toURL())
+        String blockDownloadsFailed = config.block_downloads_failed ?: 'false'
+
+        rlBlockConfig = [
+            blockDownloadsFailed: blockDownloadsFailed.equalsIgnoreCase('true'),
+            adminName: (config.admin_name ?: '') as String,
+            adminEmail: (config.admin_email ?: '') as String,
+            neverBlockIpList: ((config.never_block_ip_list ?: []) as List<String>) as Set<String>,
+            neverBlockRepoList: ((config.never_block_repo_list ?: []) as List<String>) as Set<String>,
+        ].asImmutable()
+        rlBlockConfigModified = modified
+
+        log.info "loaded ${configFile}"
+        return rlBlockConfig
+    }
+}
+
 download {
     altResponse { Request request, RepoPath responseRepoPath ->
         try {
             log.info "download request ${responseRepoPath.toPath()} from: ${request.clientAddress}"
 
-            String[] pathElements = responseRepoPath.toPath().split('/')
-            String repoName = pathElements[0]
-
-            final String pROPERTIESFILEPATH = 'plugins/rlBlock.properties'
-            // Get some stuff from the properties file
-            ConfigObject config = new ConfigSlurper().parse(
-                new File(
-                    ctx.artifactoryHome.etcDir,
-                    pROPERTIESFILEPATH
-                ).toURL()
-            )
-
-            String adminName = config.admin_name ?: ''
-            String adminEmail = config.admin_email ?: ''
-
-            String blockDownloadsFailed = config.block_downloads_failed ?: 'false'
-
-            String[] noBlockFromIp = config.never_block_ip_list ?: []
-            String[] neverBlockRepoList = config.never_block_repo_list ?: []
-
-            if (
-                blockDownloadsFailed.equalsIgnoreCase('true') &&
-                !neverBlockRepoList.contains(repoName) &&
-                !noBlockFromIp.contains(request.clientAddress)
-            ) {
-                String rlStatus = repositories.getProperties(responseRepoPath).getFirst('RL.scan-status')
-                if (rlStatus && rlStatus.equalsIgnoreCase('fail')) {
-                    String rlReport = repositories.getProperties(responseRepoPath).getFirst('RL.scan-report') ?: ''
-                    String s =
-                        "Blocking download of ${responseRepoPath.toPath()} due to failed ReversingLabs assessment."
-
-                    Map json = [
-                        message: s,
-                        admin_name: adminName,
-                        admin_email: adminEmail,
-                        report_path: rlReport,
-                    ]
-
-                    msg = new JsonBuilder(json).toString()
-                    log.warn(msg)
-                    message = msg
-                    status = 403
-                }
+            Map config = getRlBlockConfig()
+            if (!config.blockDownloadsFailed) {
+                return
+            }
+
+            // cheapest checks first, no property lookup for allowed repos and addresses
+            String repoName = responseRepoPath.repoKey
+            if (config.neverBlockRepoList.contains(repoName)) {
+                return
+            }
+
+            if (config.neverBlockIpList.contains(request.clientAddress)) {
+                return
+            }
+
+            Properties properties = repositories.getProperties(responseRepoPath)
+            String rlStatus = properties.getFirst('RL.scan-status')
+            if (rlStatus && rlStatus.equalsIgnoreCase('fail')) {
+                String rlReport = properties.getFirst('RL.scan-report') ?: ''
+                String s =
+                    "Blocking download of ${responseRepoPath.toPath()} due to failed ReversingLabs assessment."
+
+                Map json = [
+                    message: s,
+                    admin_name: config.adminName,
+                    admin_email: config.adminEmail,
+                    report_path: rlReport,
+                ]
+
+                msg = new JsonBuilder(json).toString()
+                log.warn(msg)
+                message = msg
+                status = 403
             }
         } catch (e) {
             log.error("Exception caught! Failed to execute plugin: ${e}")